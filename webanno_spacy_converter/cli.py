@@ -0,0 +1,120 @@
+import argparse
+import json
+from typing import List, Optional
+
+import spacy
+
+from webanno_spacy_converter.converters.sharded_conversion import SHARD_MODES, ShardedDocBinConversion
+from webanno_spacy_converter.converters.webanno_to_spacy import AnnotationSentencesToDocBinConverterV2
+from webanno_spacy_converter.evaluation.nel_evaluator import NELEvaluator
+from webanno_spacy_converter.parsers.tsv_parser_v3 import WebAnnoLEXISParser, WebAnnoNELParser
+
+PARSERS = {
+    "nel": WebAnnoNELParser,
+    "lexis": WebAnnoLEXISParser,
+}
+
+
+def _load_nlp(args: argparse.Namespace):
+    if args.model:
+        return spacy.load(args.model)
+    return spacy.blank(args.lang)
+
+
+def _add_conversion_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--model", help="spaCy pipeline to load (default: blank pipeline for --lang)")
+    parser.add_argument("--lang", default="sr", help="Language of the blank pipeline")
+    parser.add_argument("--sentences-per-doc", type=int, default=10)
+    parser.add_argument("--ner", action="store_true", help="Include NER annotations")
+    parser.add_argument("--nel", action="store_true", help="Include NEL annotations")
+    parser.add_argument("--tag-layer", help="Layer holding the tag annotations")
+    parser.add_argument("--lemma-layer", help="Layer holding the lemma annotations")
+    parser.add_argument("--parser", choices=sorted(PARSERS), default="nel")
+    parser.add_argument("--num-shards", type=int, required=True)
+    parser.add_argument("--mode", choices=SHARD_MODES, default="file")
+    parser.add_argument("--seed", default="")
+
+
+def _sharded_conversion(args: argparse.Namespace) -> ShardedDocBinConversion:
+    converter = AnnotationSentencesToDocBinConverterV2(
+        _load_nlp(args),
+        sentences_per_doc=args.sentences_per_doc,
+        tag_layer=args.tag_layer,
+        lemma_layer=args.lemma_layer,
+        ner=args.ner,
+        nel=args.nel,
+    )
+    return ShardedDocBinConversion(
+        converter,
+        num_shards=args.num_shards,
+        mode=args.mode,
+        seed=args.seed,
+        parser_cls=PARSERS[args.parser],
+    )
+
+
+def convert_shard(args: argparse.Namespace) -> None:
+    manifest = _sharded_conversion(args).convert_shard(args.inputs, args.shard, args.output_dir)
+    print(json.dumps(manifest, ensure_ascii=False, indent=2))
+
+
+def merge_shards(args: argparse.Namespace) -> None:
+    manifest = _sharded_conversion(args).merge(args.manifests, args.output)
+    if args.manifest_output:
+        with open(args.manifest_output, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+    print(f"Merged {manifest['sentences']} sentences into {manifest['docs']} docs: {args.output}")
+
+
+def evaluate(args: argparse.Namespace) -> None:
+    evaluator = NELEvaluator(spacy.load(args.model), batch_size=args.batch_size, n_process=args.n_process)
+    scores = evaluator.evaluate_files(
+        args.inputs,
+        parser_cls=PARSERS[args.parser],
+        disagreements_path=args.disagreements,
+    )
+    report = json.dumps(scores, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(report)
+    print(report)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="webanno_spacy_converter")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    shard = commands.add_parser("convert-shard", help="Convert the slice of a corpus that belongs to one node")
+    shard.add_argument("inputs", nargs="+", help="All WebAnno TSV files of the corpus")
+    shard.add_argument("--shard", type=int, required=True, help="Index of this node's shard")
+    shard.add_argument("--output-dir", required=True)
+    _add_conversion_arguments(shard)
+    shard.set_defaults(func=convert_shard)
+
+    merge = commands.add_parser("merge-shards", help="Verify shard manifests and merge their DocBins")
+    merge.add_argument("manifests", nargs="+", help="Manifest JSON files of all shards")
+    merge.add_argument("--output", required=True, help="Path of the merged DocBin")
+    merge.add_argument("--manifest-output", help="Where to write the merged manifest")
+    _add_conversion_arguments(merge)
+    merge.set_defaults(func=merge_shards)
+
+    evaluation = commands.add_parser("evaluate", help="Score a NER/NEL pipeline against gold WebAnno files")
+    evaluation.add_argument("inputs", nargs="+", help="Gold WebAnno TSV files")
+    evaluation.add_argument("--model", required=True, help="spaCy pipeline to evaluate")
+    evaluation.add_argument("--parser", choices=sorted(PARSERS), default="nel")
+    evaluation.add_argument("--batch-size", type=int, default=256)
+    evaluation.add_argument("--n-process", type=int, default=1)
+    evaluation.add_argument("--disagreements", help="Where to write a TSV of false positives and negatives")
+    evaluation.add_argument("--output", help="Where to write the scores as JSON")
+    evaluation.set_defaults(func=evaluate)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = build_parser().parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
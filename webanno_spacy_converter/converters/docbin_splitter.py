@@ -0,0 +1,294 @@
+import os
+from collections import defaultdict
+from itertools import groupby, zip_longest
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Type
+
+from spacy.tokens import DocBin
+
+from webanno_spacy_converter.converters.webanno_to_spacy import AnnotationSentencesToDocBinConverter
+from webanno_spacy_converter.models.annotation_sentence import UNLINKED_QIDS, AnnotationSentence
+from webanno_spacy_converter.parsers.tsv_parser_v3 import BaseWebAnnoTSVParser, WebAnnoNELParser
+from webanno_spacy_converter.utils.hashing import hash_fraction, stable_hash
+
+DEFAULT_RATIOS: Dict[str, float] = {"train": 0.8, "dev": 0.1, "test": 0.1}
+STRATIFY_MODES = ("label", "qid")
+
+_MISSING = object()
+
+
+class _SplitSink:
+    """
+    Accumulates the sentences of one split and writes them as sharded DocBins.
+
+    At most one Doc batch and one DocBin shard are held in memory at a time.
+    """
+
+    def __init__(self, converter: AnnotationSentencesToDocBinConverter, output_dir: str, docs_per_shard: int):
+        self.converter = converter
+        self.output_dir = output_dir
+        self.docs_per_shard = docs_per_shard
+        self.batch: List[AnnotationSentence] = []
+        self.doc_bin = DocBin(store_user_data=True)
+        self.sentences = 0
+        self.docs = 0
+        self.shards = 0
+
+    def add(self, sentence: AnnotationSentence) -> None:
+        self.batch.append(sentence)
+        self.sentences += 1
+        if len(self.batch) == self.converter.sentences_per_doc:
+            self._flush_batch()
+
+    def close(self) -> Dict[str, int]:
+        if self.batch:
+            self._flush_batch()
+        if len(self.doc_bin):
+            self._flush_shard()
+        return {"sentences": self.sentences, "docs": self.docs, "shards": self.shards}
+
+    def _flush_batch(self) -> None:
+        self.doc_bin.add(self.converter.convert_batch(self.batch))
+        self.batch = []
+        self.docs += 1
+        if len(self.doc_bin) == self.docs_per_shard:
+            self._flush_shard()
+
+    def _flush_shard(self) -> None:
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = os.path.join(self.output_dir, f"shard-{self.shards:05d}.spacy")
+        self.doc_bin.to_disk(path)
+        self.doc_bin = DocBin(store_user_data=True)
+        self.shards += 1
+
+
+class StreamingDocBinSplitter:
+    """
+    Splits a stream of AnnotationSentences into train/dev/test DocBins in bounded memory.
+
+    Each unit (a sentence, or a whole document when ``keep_documents_together``
+    is set) is assigned to a split by hashing its content: the sentence text, or
+    the texts of all sentences of the document. Document ids and file paths only
+    delimit documents and never affect the assignment. Without ``stratify`` the
+    assignment does not depend on the order or size of the corpus.
+
+    With ``stratify`` set, running per-stratum counts (by label set, or linked
+    vs. unlinked) are kept, and a unit whose hashed split is already more than
+    ``tolerance`` units over its quota for that stratum is moved to the split
+    with the largest deficit. Every stratum then matches the target ratios to
+    within ``tolerance`` units, but the assignment depends on the order of the
+    input: the same input in the same order always gives the same splits. The
+    decision for each unit is cached by a 64-bit hash of its content, so a
+    repeated unit always follows its first occurrence (even past the quota) and
+    never leaks across splits; the cache grows by one small entry per distinct unit.
+
+    Every split is written directly to ``<output_dir>/<split>/shard-NNNNN.spacy``.
+
+    Attributes:
+        converter (AnnotationSentencesToDocBinConverter): Converter used to build Docs.
+        output_dir (str): Directory that receives one sub-directory per split.
+        ratios (Dict[str, float]): Target fraction of units per split.
+        seed (str): Salt for the hash; change it to draw a different split.
+        stratify (Optional[str]): ``"label"``, ``"qid"`` or None.
+        keep_documents_together (bool): Assign whole documents instead of sentences.
+        docs_per_shard (int): Number of Docs per DocBin shard.
+        tolerance (float): How many units a split may exceed its per-stratum quota before rebalancing.
+    """
+
+    def __init__(
+        self,
+        converter: AnnotationSentencesToDocBinConverter,
+        output_dir: str,
+        ratios: Optional[Dict[str, float]] = None,
+        seed: str = "",
+        stratify: Optional[str] = None,
+        keep_documents_together: bool = False,
+        docs_per_shard: int = 1000,
+        tolerance: float = 1.0,
+    ):
+        ratios = dict(ratios or DEFAULT_RATIOS)
+        if not ratios or any(r <= 0 for r in ratios.values()):
+            raise ValueError(f"Split ratios must be positive, got: {ratios}")
+        if stratify is not None and stratify not in STRATIFY_MODES:
+            raise ValueError(f"Unknown stratify mode {stratify!r}, expected one of {STRATIFY_MODES}")
+        if docs_per_shard < 1:
+            raise ValueError("docs_per_shard must be at least 1")
+
+        total = sum(ratios.values())
+        self.converter = converter
+        self.output_dir = output_dir
+        self.ratios = {name: r / total for name, r in ratios.items()}
+        self.seed = seed
+        self.stratify = stratify
+        self.keep_documents_together = keep_documents_together
+        self.docs_per_shard = docs_per_shard
+        self.tolerance = tolerance
+        self._stratum_counts: Dict[str, Dict[str, int]] = {}
+        self._decisions: Dict[int, str] = {}
+
+    def split(
+        self,
+        sentences: Iterable[AnnotationSentence],
+        document_ids: Optional[Iterable[str]] = None,
+    ) -> Dict[str, Dict[str, int]]:
+        """
+        Assign every sentence to a split and write the sharded DocBins.
+
+        Args:
+            sentences (Iterable[AnnotationSentence]): Stream of annotated sentences.
+            document_ids (Optional[Iterable[str]]): See ``assign()``.
+
+        Returns:
+            Dict[str, Dict[str, int]]: Per split, the number of sentences, docs and shards written.
+        """
+        return self._write(self.assign(sentences, document_ids))
+
+    def split_files(
+        self,
+        paths: Iterable[str],
+        parser_cls: Type[BaseWebAnnoTSVParser] = WebAnnoNELParser,
+    ) -> Dict[str, Dict[str, int]]:
+        """
+        Stream-parse WebAnno TSV files and split their sentences.
+
+        Args:
+            paths (Iterable[str]): Paths of the TSV files.
+            parser_cls (Type[BaseWebAnnoTSVParser]): Parser used to read each file.
+
+        Returns:
+            Dict[str, Dict[str, int]]: Per split, the number of sentences, docs and shards written.
+        """
+        return self._write(self.assign_files(paths, parser_cls))
+
+    def assign(
+        self,
+        sentences: Iterable[AnnotationSentence],
+        document_ids: Optional[Iterable[str]] = None,
+    ) -> Iterator[Tuple[str, List[AnnotationSentence]]]:
+        """
+        Lazily assign units to splits without writing anything.
+
+        Args:
+            sentences (Iterable[AnnotationSentence]): Stream of annotated sentences.
+            document_ids (Optional[Iterable[str]]): Parallel stream of document ids,
+                required when ``keep_documents_together`` is set. Sentences of one
+                document must be contiguous in the stream, and both streams must
+                have the same length.
+
+        Yields:
+            Tuple[str, List[AnnotationSentence]]: Split name and the sentences of one unit.
+        """
+        if self.keep_documents_together and document_ids is None:
+            raise ValueError("document_ids are required when keep_documents_together is set")
+
+        if document_ids is None:
+            pairs = ((None, sentence) for sentence in sentences)
+        else:
+            pairs = self._zip_exact(document_ids, sentences)
+        return self._assign_pairs(pairs)
+
+    def assign_files(
+        self,
+        paths: Iterable[str],
+        parser_cls: Type[BaseWebAnnoTSVParser] = WebAnnoNELParser,
+    ) -> Iterator[Tuple[str, List[AnnotationSentence]]]:
+        """
+        Stream-parse WebAnno TSV files and lazily assign their sentences to splits.
+
+        Each file is treated as one document when ``keep_documents_together`` is set;
+        it is assigned by the text of its sentences, so the same file gets the same
+        split however its path is spelled.
+
+        Args:
+            paths (Iterable[str]): Paths of the TSV files.
+            parser_cls (Type[BaseWebAnnoTSVParser]): Parser used to read each file.
+
+        Yields:
+            Tuple[str, List[AnnotationSentence]]: Split name and the sentences of one unit.
+        """
+        pairs = (
+            (path, sentence)
+            for path in paths
+            for sentence in parser_cls(path).iter_sentences()
+        )
+        return self._assign_pairs(pairs)
+
+    @staticmethod
+    def _zip_exact(
+        document_ids: Iterable[str],
+        sentences: Iterable[AnnotationSentence],
+    ) -> Iterator[Tuple[str, AnnotationSentence]]:
+        for doc_id, sentence in zip_longest(document_ids, sentences, fillvalue=_MISSING):
+            if doc_id is _MISSING or sentence is _MISSING:
+                raise ValueError("document_ids and sentences have different lengths")
+            yield doc_id, sentence
+
+    def _assign_pairs(
+        self,
+        pairs: Iterable[Tuple[Optional[str], AnnotationSentence]],
+    ) -> Iterator[Tuple[str, List[AnnotationSentence]]]:
+        self._stratum_counts = {}
+        self._decisions = {}
+        for key, stratum, unit in self._iter_units(pairs):
+            yield self._assign(key, stratum), unit
+
+    def _write(self, assignments: Iterable[Tuple[str, List[AnnotationSentence]]]) -> Dict[str, Dict[str, int]]:
+        sinks = {
+            name: _SplitSink(self.converter, os.path.join(self.output_dir, name), self.docs_per_shard)
+            for name in self.ratios
+        }
+        for name, unit in assignments:
+            sink = sinks[name]
+            for sentence in unit:
+                sink.add(sentence)
+        return {name: sink.close() for name, sink in sinks.items()}
+
+    def _iter_units(
+        self,
+        pairs: Iterable[Tuple[Optional[str], AnnotationSentence]],
+    ) -> Iterator[Tuple[str, str, List[AnnotationSentence]]]:
+        if not self.keep_documents_together:
+            for _, sentence in pairs:
+                yield sentence.text, self._stratum([sentence]), [sentence]
+            return
+
+        # Only the sentences of the current document are buffered. The document
+        # is keyed on its text, not its id, so renaming or moving a file does not
+        # change its split
+        for _, group in groupby(pairs, key=lambda pair: pair[0]):
+            unit = [sentence for _, sentence in group]
+            yield "\n".join(sentence.text for sentence in unit), self._stratum(unit), unit
+
+    def _stratum(self, sentences: List[AnnotationSentence]) -> str:
+        if self.stratify == "label":
+            return "|".join(sorted({label for s in sentences for _, _, label, _ in s.entities}))
+        if self.stratify == "qid":
+            linked = any(qid not in UNLINKED_QIDS for s in sentences for *_, qid in s.entities)
+            return "linked" if linked else "unlinked"
+        return ""
+
+    def _assign(self, key: str, stratum: str) -> str:
+        fraction = hash_fraction(key, self.seed)
+        preferred = None
+        cumulative = 0.0
+        for name, ratio in self.ratios.items():
+            cumulative += ratio
+            if fraction < cumulative:
+                preferred = name
+                break
+        if preferred is None:  # guard against floating point rounding
+            preferred = name
+
+        if self.stratify is None:
+            return preferred
+
+        counts = self._stratum_counts.setdefault(stratum, defaultdict(int))
+        digest = stable_hash(key, self.seed)
+        choice = self._decisions.get(digest)
+        if choice is None:
+            seen = sum(counts.values()) + 1
+            choice = preferred
+            if counts[preferred] + 1 > self.ratios[preferred] * seen + self.tolerance:
+                choice = max(self.ratios, key=lambda n: self.ratios[n] * seen - counts[n])
+            self._decisions[digest] = choice
+        counts[choice] += 1
+        return choice
@@ -0,0 +1,153 @@
+from collections import defaultdict
+from itertools import groupby
+from typing import Callable, DefaultDict, Iterable, Iterator, List, Optional, Tuple, Type
+
+from spacy.kb import InMemoryLookupKB
+from spacy.vocab import Vocab
+
+from webanno_spacy_converter.models.annotation_sentence import UNLINKED_QIDS, AnnotationSentence
+from webanno_spacy_converter.parsers.tsv_parser_v3 import BaseWebAnnoTSVParser, WebAnnoNELParser
+from webanno_spacy_converter.utils.spill_counter import SpillToDiskCounter
+
+
+class KnowledgeBaseBuilder:
+    """
+    Builds a spaCy ``InMemoryLookupKB`` for the entity_linker from annotated sentences.
+
+    Mentions are streamed in via ``add_sentences()`` or ``add_files()``; every
+    (alias, QID) pair is counted in a ``SpillToDiskCounter``, so only
+    ``max_entries_in_memory`` distinct pairs are held in RAM at once. ``build()``
+    then walks the merged counts alias by alias, computes prior probabilities
+    P(QID | alias), applies the pruning thresholds and bulk-loads the result.
+
+    Only the pair counts are bounded: ``build()`` keeps a frequency per
+    distinct QID in memory, and the resulting ``InMemoryLookupKB`` holds every
+    kept entity and alias, so both grow with the number of distinct entities.
+
+    Attributes:
+        vocab (Vocab): Vocab shared with the pipeline the KB is built for.
+        entity_vector_length (int): Length of the entity vectors stored in the KB.
+        min_pair_count (int): Minimum count of an (alias, QID) pair to keep it.
+        min_prior_prob (float): Minimum prior probability of a candidate to keep it.
+        max_candidates (int): Maximum number of candidates kept per alias.
+        min_entity_freq (int): Minimum number of kept mentions for an entity to enter the KB.
+        lowercase_aliases (bool): Whether to lowercase mention text before counting.
+        entity_vector_fn (Optional[Callable[[str], List[float]]]): Returns the vector of a QID;
+            zero vectors are used if None.
+    """
+
+    def __init__(
+        self,
+        vocab: Vocab,
+        entity_vector_length: int = 64,
+        min_pair_count: int = 1,
+        min_prior_prob: float = 0.0,
+        max_candidates: int = 10,
+        min_entity_freq: int = 1,
+        lowercase_aliases: bool = False,
+        entity_vector_fn: Optional[Callable[[str], List[float]]] = None,
+        max_entries_in_memory: int = 1_000_000,
+        tmp_dir: Optional[str] = None,
+        max_spill_runs: int = 64,
+    ):
+        self.vocab = vocab
+        self.entity_vector_length = entity_vector_length
+        self.min_pair_count = min_pair_count
+        self.min_prior_prob = min_prior_prob
+        self.max_candidates = max_candidates
+        self.min_entity_freq = min_entity_freq
+        self.lowercase_aliases = lowercase_aliases
+        self.entity_vector_fn = entity_vector_fn
+        self.counter = SpillToDiskCounter(
+            max_entries=max_entries_in_memory, tmp_dir=tmp_dir, max_runs=max_spill_runs
+        )
+
+    def add_sentences(self, sentences: Iterable[AnnotationSentence]) -> None:
+        """
+        Count the linked entity mentions of a stream of sentences.
+
+        Args:
+            sentences (Iterable[AnnotationSentence]): Parsed sentences with ``entities``.
+        """
+        for sentence in sentences:
+            for start, end, _, qid in sentence.entities:
+                if qid in UNLINKED_QIDS:
+                    continue
+                alias = sentence.text[start:end]
+                if self.lowercase_aliases:
+                    alias = alias.lower()
+                self.counter.add((alias, qid))
+
+    def add_files(self, paths: Iterable[str], parser_cls: Type[BaseWebAnnoTSVParser] = WebAnnoNELParser) -> None:
+        """
+        Stream-parse WebAnno TSV files and count their linked mentions.
+
+        Args:
+            paths (Iterable[str]): Paths of the TSV files.
+            parser_cls (Type[BaseWebAnnoTSVParser]): Parser used to read each file.
+        """
+        for path in paths:
+            self.add_sentences(parser_cls(path).iter_sentences())
+
+    def build(self) -> InMemoryLookupKB:
+        """
+        Compute priors, prune and load the counted mentions into a new KB.
+
+        Returns:
+            InMemoryLookupKB: The populated knowledge base.
+        """
+        entity_freqs: DefaultDict[str, int] = defaultdict(int)
+        for _, candidates in self._iter_candidates():
+            for qid, count, _ in candidates:
+                entity_freqs[qid] += count
+
+        entities = sorted(qid for qid, freq in entity_freqs.items() if freq >= self.min_entity_freq)
+        kb = InMemoryLookupKB(vocab=self.vocab, entity_vector_length=self.entity_vector_length)
+        kb.set_entities(
+            entity_list=entities,
+            freq_list=[entity_freqs[qid] for qid in entities],
+            vector_list=[self._entity_vector(qid) for qid in entities],
+        )
+
+        # The KB must know all entities before aliases can refer to them,
+        # so the merged counts are streamed a second time
+        for alias, candidates in self._iter_candidates():
+            kept = [(qid, prob) for qid, count, prob in candidates if entity_freqs[qid] >= self.min_entity_freq]
+            if kept:
+                kb.add_alias(
+                    alias=alias,
+                    entities=[qid for qid, _ in kept],
+                    probabilities=[prob for _, prob in kept],
+                )
+        return kb
+
+    def close(self) -> None:
+        """Remove the temporary files of the mention counter."""
+        self.counter.close()
+
+    def _iter_candidates(self) -> Iterator[Tuple[str, List[Tuple[str, int, float]]]]:
+        """
+        Yield each alias with its pruned candidates as (QID, count, prior) tuples.
+
+        Priors are relative to all linked mentions of the alias, before pruning.
+        """
+        for alias, group in groupby(self.counter.items(), key=lambda item: item[0][0]):
+            pairs = [(key[1], count) for key, count in group]
+            total = sum(count for _, count in pairs)
+            candidates = [
+                (qid, count, count / total)
+                for qid, count in pairs
+                if count >= self.min_pair_count and count / total >= self.min_prior_prob
+            ]
+            candidates.sort(key=lambda c: (-c[1], c[0]))
+            yield alias, candidates[:self.max_candidates]
+
+    def _entity_vector(self, qid: str) -> List[float]:
+        if self.entity_vector_fn is None:
+            return [0.0] * self.entity_vector_length
+        vector = list(self.entity_vector_fn(qid))
+        if len(vector) != self.entity_vector_length:
+            raise ValueError(
+                f"Vector for entity {qid} has length {len(vector)}, expected {self.entity_vector_length}"
+            )
+        return vector
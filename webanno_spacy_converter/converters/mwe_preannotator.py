@@ -0,0 +1,313 @@
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Type
+
+from spacy.tokens import Doc, Span
+
+from webanno_spacy_converter.models.annotation_sentence import AnnotationSentence
+from webanno_spacy_converter.models.annotation_token import AnnotationToken
+from webanno_spacy_converter.models.sentence_with_mwes import AnnotatedSentenceWithMWEs, MultiWordExpression
+from webanno_spacy_converter.parsers.tsv_parser_v3 import BaseWebAnnoTSVParser, WebAnnoLEXISParser
+
+
+class _TrieNode:
+    __slots__ = ("children", "entries", "gapped")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        # (lemma, type) -> number of times seen in the source corpus
+        self.entries: Counter = Counter()
+        # Whether this expression was ever annotated with intervening tokens
+        self.gapped = False
+
+
+class MWELexicon:
+    """
+    A token trie of multi-word expressions mined from an annotated corpus.
+
+    Each MWE is stored under the sequence of its component token keys in
+    surface order; the key of a token is the value of ``key_layer`` (e.g. the
+    lemma column) or its text when ``key_layer`` is None.
+
+    Attributes:
+        key_layer (Optional[str]): Token layer used as the matching key.
+        lowercase (bool): Whether keys are lowercased.
+        size (int): Number of distinct key sequences in the lexicon.
+    """
+
+    def __init__(self, key_layer: Optional[str] = None, lowercase: bool = True):
+        self.key_layer = key_layer
+        self.lowercase = lowercase
+        self.root = _TrieNode()
+        self.size = 0
+
+    @classmethod
+    def from_files(
+        cls,
+        paths: Iterable[str],
+        key_layer: Optional[str] = None,
+        lowercase: bool = True,
+        parser_cls: Type[BaseWebAnnoTSVParser] = WebAnnoLEXISParser,
+    ) -> "MWELexicon":
+        """
+        Build a lexicon from the MWEs of WebAnno LEXIS TSV files.
+
+        Args:
+            paths (Iterable[str]): Paths of the TSV files.
+            key_layer (Optional[str]): Token layer used as the matching key.
+            lowercase (bool): Whether keys are lowercased.
+            parser_cls (Type[BaseWebAnnoTSVParser]): Parser that yields AnnotatedSentenceWithMWEs.
+
+        Returns:
+            MWELexicon: The compiled lexicon.
+        """
+        lexicon = cls(key_layer=key_layer, lowercase=lowercase)
+        for path in paths:
+            lexicon.add_sentences(parser_cls(path).iter_sentences())
+        return lexicon
+
+    def add_sentences(self, sentences: Iterable[AnnotatedSentenceWithMWEs]) -> None:
+        """
+        Add the MWEs of parsed sentences to the lexicon.
+
+        Args:
+            sentences (Iterable[AnnotatedSentenceWithMWEs]): Sentences with ``mwes``.
+        """
+        for sentence in sentences:
+            for mwe in sentence.mwes:
+                indices = sorted(mwe.token_indices)
+                keys = [self.token_key(sentence.tokens[i]) for i in indices]
+                gapped = indices[-1] - indices[0] + 1 != len(indices)
+                self.add(keys, mwe.lemma, mwe.type, gapped=gapped)
+
+    def add(self, keys: Sequence[str], lemma: str, mwe_type: str = "", gapped: bool = False) -> None:
+        """
+        Add a single expression.
+
+        Args:
+            keys (Sequence[str]): Component keys in surface order.
+            lemma (str): Canonical form of the expression.
+            mwe_type (str): MWE type (e.g. ``LVC.full``).
+            gapped (bool): Whether this occurrence had intervening tokens.
+        """
+        if not keys:
+            return
+        node = self.root
+        for key in keys:
+            node = node.children.setdefault(self.normalize(key), _TrieNode())
+        if not node.entries:
+            self.size += 1
+        node.entries[(lemma, mwe_type)] += 1
+        node.gapped = node.gapped or gapped
+
+    def token_key(self, token: AnnotationToken) -> str:
+        """
+        Return the matching key of a parsed token.
+
+        Raises:
+            ValueError: If ``key_layer`` is set and the token does not carry that layer;
+                matching lemma keys against surface forms would silently find nothing.
+        """
+        if self.key_layer is None:
+            return self.normalize(token.text)
+        key = token.layers.get(self.key_layer)
+        if key is None:
+            raise ValueError(
+                f"Token {token.sentence_index}-{token.token_index} ({token.text!r}) has no "
+                f"{self.key_layer!r} layer, which this lexicon is keyed on"
+            )
+        return self.normalize(key)
+
+    def normalize(self, key: str) -> str:
+        """Normalize a raw key the same way lexicon keys are normalized."""
+        return key.lower() if self.lowercase else key
+
+
+class MWEPreAnnotator:
+    """
+    Pre-annotates sentences with the MWEs of an ``MWELexicon``.
+
+    A sentence is scanned once, left to right, while the partial trie matches
+    that are still alive are carried along. A partial match may skip at most
+    ``max_gap`` tokens between two components, so the work per token is bounded
+    and the scan is linear in the sentence length. Overlapping matches are
+    resolved greedily, longest first, then leftmost.
+
+    Attributes:
+        lexicon (MWELexicon): The compiled lexicon.
+        max_gap (int): Maximum number of tokens allowed between two components.
+        allow_unseen_gaps (bool): Match with gaps even for expressions that were
+            only seen contiguous in the source corpus.
+        next_group_id (int): Next WebAnno disambiguation id for contiguous multi-token MWEs.
+    """
+
+    def __init__(
+        self,
+        lexicon: MWELexicon,
+        max_gap: int = 3,
+        allow_unseen_gaps: bool = False,
+        first_group_id: int = 1,
+    ):
+        self.lexicon = lexicon
+        self.max_gap = max_gap
+        self.allow_unseen_gaps = allow_unseen_gaps
+        self.next_group_id = first_group_id
+
+    def find(self, keys: Sequence[str]) -> List[MultiWordExpression]:
+        """
+        Find non-overlapping MWEs in a sequence of token keys.
+
+        Args:
+            keys (Sequence[str]): Normalized token keys of one sentence.
+
+        Returns:
+            List[MultiWordExpression]: Matches ordered by their first token.
+        """
+        matches: List[Tuple[Tuple[int, ...], _TrieNode]] = []
+        # (id(node), last matched position) -> (node, matched positions)
+        states: Dict[Tuple[int, int], Tuple[_TrieNode, Tuple[int, ...]]] = {}
+        root = self.lexicon.root
+
+        for i, key in enumerate(keys):
+            next_states: Dict[Tuple[int, int], Tuple[_TrieNode, Tuple[int, ...]]] = {}
+            candidates = [(root, ())] + list(states.values())
+            for node, indices in candidates:
+                child = node.children.get(key)
+                if child is None:
+                    continue
+                extended = indices + (i,)
+                next_states.setdefault((id(child), i), (child, extended))
+                if child.entries and self._accepts(child, extended):
+                    matches.append((extended, child))
+
+            for (node_id, last), state in states.items():
+                if i - last <= self.max_gap:
+                    next_states.setdefault((node_id, last), state)
+            states = next_states
+
+        return self._select(matches)
+
+    def annotate(self, sentence: AnnotationSentence) -> AnnotatedSentenceWithMWEs:
+        """
+        Detect MWEs in a sentence and write them to the ``MWEid``/``MWElemma``/``MWEtype`` layers.
+
+        The token layers are updated in place, in the same shape the LEXIS
+        corpus uses: contiguous multi-token MWEs carry a ``[group]`` suffix,
+        gapped ones are linked by a shared ``MWEid`` number.
+
+        Args:
+            sentence (AnnotationSentence): The sentence to annotate.
+
+        Returns:
+            AnnotatedSentenceWithMWEs: The sentence with its detected ``mwes``.
+        """
+        tokens = sentence.tokens
+        mwes = self.find([self.lexicon.token_key(token) for token in tokens])
+
+        for number, mwe in enumerate(mwes, start=1):
+            mwe.group_id = str(number)
+            indices = mwe.token_indices
+            contiguous = indices[-1] - indices[0] + 1 == len(indices)
+            if contiguous and len(indices) > 1:
+                suffix = f"[{self.next_group_id}]"
+                self.next_group_id += 1
+                for i in indices:
+                    tokens[i].add_layer("MWEid", f"{number}{suffix}")
+                    tokens[i].add_layer("MWElemma", f"{mwe.lemma}{suffix}")
+                    tokens[i].add_layer("MWEtype", f"{mwe.type}{suffix}")
+            else:
+                for position, i in enumerate(indices):
+                    tokens[i].add_layer("MWEid", str(number))
+                    tokens[i].add_layer("MWElemma", mwe.lemma if position == 0 else "*")
+                    tokens[i].add_layer("MWEtype", mwe.type)
+
+        return AnnotatedSentenceWithMWEs(
+            text=sentence.text,
+            tokens=tokens,
+            entities=sentence.entities,
+            mwes=mwes,
+        )
+
+    def annotate_all(self, sentences: Iterable[AnnotationSentence]) -> Iterator[AnnotatedSentenceWithMWEs]:
+        """Lazily annotate a stream of sentences."""
+        for sentence in sentences:
+            yield self.annotate(sentence)
+
+    def annotate_doc(self, doc: Doc, spans_key: str = "mwe") -> List[MultiWordExpression]:
+        """
+        Detect MWEs in a spaCy Doc and store them in ``doc.spans[spans_key]``.
+
+        Tokens are keyed by ``lemma_`` when the lexicon uses a key layer and by
+        their text otherwise; a ``ValueError`` is raised if lemmas are needed but missing. Each contiguous run of an MWE becomes one span
+        labelled with the MWE type; all spans of one MWE share its lemma as ``id_``.
+
+        Args:
+            doc (Doc): The Doc to annotate.
+            spans_key (str): Key of the span group to write.
+
+        Returns:
+            List[MultiWordExpression]: The detected MWEs, with Doc token indices.
+        """
+        normalize = self.lexicon.normalize
+        if self.lexicon.key_layer is None:
+            keys = [normalize(token.text) for token in doc]
+        else:
+            keys = [normalize(token.lemma_) for token in doc]
+            if any(not key for key in keys):
+                raise ValueError(
+                    f"The lexicon is keyed on {self.lexicon.key_layer!r}, but the Doc has tokens "
+                    "without a lemma; run a lemmatizer first"
+                )
+
+        mwes = self.find(keys)
+        doc.spans[spans_key] = [span for mwe in mwes for span in self.make_spans(doc, mwe)]
+        return mwes
+
+    @staticmethod
+    def make_spans(doc: Doc, mwe: MultiWordExpression, token_offset: int = 0) -> List[Span]:
+        """
+        Convert an MWE into spaCy spans, one per contiguous run of tokens.
+
+        Args:
+            doc (Doc): The Doc the MWE refers to.
+            mwe (MultiWordExpression): The expression.
+            token_offset (int): Doc index of the sentence's first token.
+
+        Returns:
+            List[Span]: Spans labelled with the MWE type, with the lemma as ``id_``.
+        """
+        spans: List[Span] = []
+        indices = [i + token_offset for i in mwe.token_indices]
+        start = prev = indices[0]
+        for i in indices[1:] + [None]:
+            if i is not None and i == prev + 1:
+                prev = i
+                continue
+            span = Span(doc, start, prev + 1, label=mwe.type)
+            span.id_ = mwe.lemma
+            spans.append(span)
+            if i is not None:
+                start = prev = i
+        return spans
+
+    def _accepts(self, node: _TrieNode, indices: Tuple[int, ...]) -> bool:
+        contiguous = indices[-1] - indices[0] + 1 == len(indices)
+        return contiguous or node.gapped or self.allow_unseen_gaps
+
+    @staticmethod
+    def _select(matches: List[Tuple[Tuple[int, ...], _TrieNode]]) -> List[MultiWordExpression]:
+        matches.sort(key=lambda m: (-len(m[0]), m[0]))
+        taken = set()
+        selected: List[MultiWordExpression] = []
+        for indices, node in matches:
+            if taken.intersection(indices):
+                continue
+            taken.update(indices)
+            (lemma, mwe_type), _ = node.entries.most_common(1)[0]
+            selected.append(MultiWordExpression(
+                lemma=lemma,
+                token_count=len(indices),
+                token_indices=list(indices),
+                type=mwe_type,
+            ))
+        selected.sort(key=lambda mwe: mwe.token_indices[0])
+        return selected
@@ -0,0 +1,289 @@
+import hashlib
+import heapq
+import json
+import os
+from typing import Dict, Iterable, Iterator, List, Tuple, Type
+
+from spacy.tokens import Doc, DocBin
+
+from webanno_spacy_converter.converters.webanno_to_spacy import AnnotationSentencesToDocBinConverter
+from webanno_spacy_converter.parsers.tsv_parser_v3 import BaseWebAnnoTSVParser, WebAnnoNELParser
+from webanno_spacy_converter.utils.hashing import stable_hash
+
+SHARD_MODES = ("file", "sentence")
+
+# user_data keys carrying the origin of each sentence Doc inside a shard
+_SOURCE_KEY = "webanno_source"
+_INDEX_KEY = "webanno_sentence_index"
+
+
+def shard_of(key: str, num_shards: int, seed: str = "") -> int:
+    """
+    Return the shard a key belongs to.
+
+    Args:
+        key (str): File path or sentence text.
+        num_shards (int): Total number of shards.
+        seed (str): Optional salt.
+
+    Returns:
+        int: Shard index in ``range(num_shards)``.
+    """
+    return stable_hash(key, seed) % num_shards
+
+
+def file_sha256(path: str) -> str:
+    """Return the hex SHA-256 digest of a file."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ShardedDocBinConversion:
+    """
+    Splits a WebAnno-to-DocBin conversion across nodes without a coordinator.
+
+    Every node runs ``convert_shard()`` with the same file list, shard count,
+    mode and seed, and its own shard index. Work is assigned by a stable hash
+    of the file path (``mode="file"``; other files are not even parsed) or of
+    the sentence text (``mode="sentence"``). Each node writes one DocBin with
+    one Doc per sentence plus a JSON manifest with counts, checksums of the
+    shard and of every input file it read, and the conversion settings.
+
+    ``merge()`` verifies the manifests (settings, checksums, and that every node
+    read the same contents for a file), restores the original corpus order and
+    re-batches the sentences into ``sentences_per_doc`` Docs, so the merged
+    DocBin is identical to a single-node ``converter.convert()`` over the
+    files in sorted path order, whatever the number of shards.
+
+    Attributes:
+        converter (AnnotationSentencesToDocBinConverter): Converter used to build Docs.
+        num_shards (int): Total number of shards (nodes).
+        mode (str): ``"file"`` or ``"sentence"``.
+        seed (str): Salt for the hash.
+        parser_cls (Type[BaseWebAnnoTSVParser]): Parser used to read the files.
+    """
+
+    def __init__(
+        self,
+        converter: AnnotationSentencesToDocBinConverter,
+        num_shards: int,
+        mode: str = "file",
+        seed: str = "",
+        parser_cls: Type[BaseWebAnnoTSVParser] = WebAnnoNELParser,
+    ):
+        if num_shards < 1:
+            raise ValueError("num_shards must be at least 1")
+        if mode not in SHARD_MODES:
+            raise ValueError(f"Unknown shard mode {mode!r}, expected one of {SHARD_MODES}")
+        self.converter = converter
+        self.num_shards = num_shards
+        self.mode = mode
+        self.seed = seed
+        self.parser_cls = parser_cls
+
+    def convert_shard(self, paths: Iterable[str], shard_index: int, output_dir: str) -> Dict:
+        """
+        Parse and convert the slice of the corpus that belongs to one shard.
+
+        Args:
+            paths (Iterable[str]): All input TSV files; must be the same list on every node.
+            shard_index (int): Index of this shard, in ``range(num_shards)``.
+            output_dir (str): Directory receiving the shard DocBin and manifest.
+
+        Returns:
+            Dict: The shard manifest.
+        """
+        if not 0 <= shard_index < self.num_shards:
+            raise ValueError(f"shard_index must be in [0, {self.num_shards}), got {shard_index}")
+
+        doc_bin = DocBin(store_user_data=True)
+        sources: Dict[str, Dict] = {}
+        tokens = 0
+        for path in sorted(set(paths)):
+            if self.mode == "file" and shard_of(path, self.num_shards, self.seed) != shard_index:
+                continue
+            sources[path] = {"sentences": 0, "sha256": file_sha256(path)}
+            for sentence_index, sentence in enumerate(self.parser_cls(path).iter_sentences(), start=1):
+                if self.mode == "sentence" and shard_of(sentence.text, self.num_shards, self.seed) != shard_index:
+                    continue
+                doc = self.converter.convert_batch([sentence])
+                doc.user_data[_SOURCE_KEY] = path
+                doc.user_data[_INDEX_KEY] = sentence_index
+                doc_bin.add(doc)
+                sources[path]["sentences"] += 1
+                tokens += len(doc)
+
+        os.makedirs(output_dir, exist_ok=True)
+        name = f"shard-{shard_index:05d}-of-{self.num_shards:05d}"
+        docbin_path = os.path.join(output_dir, name + ".spacy")
+        doc_bin.to_disk(docbin_path)
+
+        manifest = {
+            "num_shards": self.num_shards,
+            "shard_index": shard_index,
+            "mode": self.mode,
+            "seed": self.seed,
+            "settings": self.settings(),
+            "docbin": os.path.basename(docbin_path),
+            "sha256": file_sha256(docbin_path),
+            "sentences": len(doc_bin),
+            "tokens": tokens,
+            "sources": sources,
+        }
+        with open(os.path.join(output_dir, name + ".json"), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2, sort_keys=True)
+        return manifest
+
+    def merge(self, manifest_paths: Iterable[str], output_path: str) -> Dict:
+        """
+        Verify shard manifests and stitch the shards into one DocBin.
+
+        Args:
+            manifest_paths (Iterable[str]): Paths of the manifests of all shards.
+            output_path (str): Path of the merged DocBin.
+
+        Returns:
+            Dict: Merged manifest, with every source's renumbered first ``sentence_index``.
+        """
+        shards = self._load_manifests(manifest_paths)
+        expected_sources = self._merge_sources([manifest for _, manifest in shards])
+
+        streams = [self._iter_shard(path, manifest) for path, manifest in shards]
+        merged = DocBin(store_user_data=True)
+        sources: List[Dict] = []
+        batch: List[Doc] = []
+        sentence_index = 0
+        tokens = 0
+        previous_key = None
+        for key, doc in heapq.merge(*streams, key=lambda item: item[0]):
+            if key == previous_key:
+                raise ValueError(f"Sentence {key[1]} of {key[0]} appears in more than one shard")
+            previous_key = key
+
+            sentence_index += 1
+            if not sources or sources[-1]["path"] != key[0]:
+                sources.append({
+                    "path": key[0],
+                    "sha256": expected_sources[key[0]]["sha256"],
+                    "first_sentence_index": sentence_index,
+                    "sentences": 0,
+                })
+            sources[-1]["sentences"] += 1
+            tokens += len(doc)
+
+            batch.append(doc)
+            if len(batch) == self.converter.sentences_per_doc:
+                merged.add(Doc.from_docs(batch))
+                batch = []
+        if batch:
+            merged.add(Doc.from_docs(batch))
+
+        self._check_counts(shards, expected_sources, sources, tokens)
+        merged.to_disk(output_path)
+        return {
+            "num_shards": self.num_shards,
+            "mode": self.mode,
+            "seed": self.seed,
+            "docbin": os.path.basename(output_path),
+            "sha256": file_sha256(output_path),
+            "settings": self.settings(),
+            "sentences": sentence_index,
+            "tokens": tokens,
+            "docs": len(merged),
+            "sources": sources,
+        }
+
+    def settings(self) -> Dict:
+        """
+        Return the conversion settings that every shard and the merge must share.
+
+        Returns:
+            Dict: Parser and converter classes, batching and converter options.
+        """
+        converter = self.converter
+        return {
+            "parser": self.parser_cls.__name__,
+            "converter": type(converter).__name__,
+            "sentences_per_doc": converter.sentences_per_doc,
+            "ner": getattr(converter, "ner", None),
+            "nel": getattr(converter, "nel", None),
+            "tag_layer": getattr(converter, "tag_layer", None),
+            "lemma_layer": getattr(converter, "lemma_layer", None),
+        }
+
+    @staticmethod
+    def _merge_sources(manifests: List[Dict]) -> Dict[str, Dict]:
+        """Combine the per-file counts of all shards, checking they read the same file contents."""
+        sources: Dict[str, Dict] = {}
+        for manifest in manifests:
+            for path, source in manifest["sources"].items():
+                merged = sources.setdefault(path, {"sentences": 0, "sha256": source["sha256"]})
+                if merged["sha256"] != source["sha256"]:
+                    raise ValueError(
+                        f"Shard {manifest['shard_index']} read different contents for {path}: "
+                        f"{source['sha256']} != {merged['sha256']}"
+                    )
+                merged["sentences"] += source["sentences"]
+        return sources
+
+    @staticmethod
+    def _check_counts(
+        shards: List[Tuple[str, Dict]],
+        expected_sources: Dict[str, Dict],
+        sources: List[Dict],
+        tokens: int,
+    ) -> None:
+        """Compare the merged token and per-file sentence counts with the manifests."""
+        expected_tokens = sum(manifest["tokens"] for _, manifest in shards)
+        if tokens != expected_tokens:
+            raise ValueError(f"Merged {tokens} tokens, manifests say {expected_tokens}")
+        counts = {source["path"]: source["sentences"] for source in sources}
+        for path, source in expected_sources.items():
+            if counts.get(path, 0) != source["sentences"]:
+                raise ValueError(
+                    f"Merged {counts.get(path, 0)} sentences of {path}, manifests say {source['sentences']}"
+                )
+
+    def _load_manifests(self, manifest_paths: Iterable[str]) -> List[Tuple[str, Dict]]:
+        shards: Dict[int, Tuple[str, Dict]] = {}
+        for manifest_path in manifest_paths:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            checks = (
+                ("num_shards", self.num_shards),
+                ("mode", self.mode),
+                ("seed", self.seed),
+                ("settings", self.settings()),
+            )
+            for field, expected in checks:
+                if manifest.get(field) != expected:
+                    raise ValueError(
+                        f"{manifest_path}: {field} is {manifest.get(field)!r}, expected {expected!r}"
+                    )
+            index = manifest["shard_index"]
+            if index in shards:
+                raise ValueError(f"Shard {index} given twice: {shards[index][0]} and {manifest_path}")
+
+            docbin_path = os.path.join(os.path.dirname(manifest_path), manifest["docbin"])
+            checksum = file_sha256(docbin_path)
+            if checksum != manifest["sha256"]:
+                raise ValueError(f"Checksum mismatch for {docbin_path}: {checksum} != {manifest['sha256']}")
+            shards[index] = (docbin_path, manifest)
+
+        missing = sorted(set(range(self.num_shards)) - set(shards))
+        if missing:
+            raise ValueError(f"Missing shards: {missing}")
+        return [shards[index] for index in range(self.num_shards)]
+
+    def _iter_shard(self, docbin_path: str, manifest: Dict) -> Iterator[Tuple[Tuple[str, int], Doc]]:
+        doc_bin = DocBin(store_user_data=True).from_disk(docbin_path)
+        if len(doc_bin) != manifest["sentences"]:
+            raise ValueError(
+                f"{docbin_path} holds {len(doc_bin)} sentences, manifest says {manifest['sentences']}"
+            )
+        for doc in doc_bin.get_docs(self.converter.nlp.vocab):
+            key = (doc.user_data.pop(_SOURCE_KEY), doc.user_data.pop(_INDEX_KEY))
+            yield key, doc
@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Iterable, Iterator
 from spacy.tokens import DocBin, Doc, Span
 from webanno_spacy_converter.models.annotation_sentence import AnnotationSentence
 
@@ -26,21 +26,41 @@ class AnnotationSentencesToDocBinConverter:
             DocBin: The resulting DocBin object.
         """
         doc_bin = DocBin(store_user_data=True)
-        batch: List[Doc] = []
+        for doc in self.iter_docs(sentences):
+            doc_bin.add(doc)
+        return doc_bin
+
+    def iter_docs(self, sentences: Iterable[AnnotationSentence]) -> Iterator[Doc]:
+        """
+        Lazily convert a stream of AnnotationSentences into combined Docs.
 
+        Args:
+            sentences (Iterable[AnnotationSentence]): Stream of annotated sentences.
+
+        Yields:
+            Doc: One Doc per ``sentences_per_doc`` sentences.
+        """
+        batch: List[AnnotationSentence] = []
         for sent in sentences:
-            doc = self._convert_sentence_to_doc(sent)
-            batch.append(doc)
+            batch.append(sent)
             if len(batch) == self.sentences_per_doc:
-                combined = Doc.from_docs(batch)
-                doc_bin.add(combined)
+                yield self.convert_batch(batch)
                 batch = []
 
         if batch:
-            combined = Doc.from_docs(batch)
-            doc_bin.add(combined)
+            yield self.convert_batch(batch)
 
-        return doc_bin
+    def convert_batch(self, sentences: List[AnnotationSentence]) -> Doc:
+        """
+        Convert a batch of AnnotationSentences into a single combined Doc.
+
+        Args:
+            sentences (List[AnnotationSentence]): Sentences to combine.
+
+        Returns:
+            Doc: The combined Doc, one sentence per input sentence.
+        """
+        return Doc.from_docs([self._convert_sentence_to_doc(sent) for sent in sentences])
 
     def _convert_sentence_to_doc(self, sent: AnnotationSentence) -> Doc:
         """
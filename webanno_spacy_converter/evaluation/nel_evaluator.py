@@ -0,0 +1,201 @@
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import DefaultDict, Dict, IO, Iterable, Iterator, List, Optional, Set, Tuple, Type
+
+from spacy.tokens import Doc
+
+from webanno_spacy_converter.models.annotation_sentence import UNLINKED_QIDS, AnnotationSentence
+from webanno_spacy_converter.parsers.tsv_parser_v3 import BaseWebAnnoTSVParser, WebAnnoNELParser
+
+# (start, end, label or QID) character spans within a sentence
+Item = Tuple[int, int, str]
+
+DISAGREEMENT_HEADER = "sentence\ttask\terror\tstart\tend\tlabel\tqid\tspan\n"
+
+
+@dataclass
+class PRFCounts:
+    """
+    Running true positive, false positive and false negative counts.
+
+    Attributes:
+        tp (int): Items both in gold and prediction.
+        fp (int): Predicted items missing from gold.
+        fn (int): Gold items missing from prediction.
+    """
+
+    tp: int = 0
+    fp: int = 0
+    fn: int = 0
+
+    @property
+    def precision(self) -> float:
+        return self.tp / (self.tp + self.fp) if self.tp + self.fp else 0.0
+
+    @property
+    def recall(self) -> float:
+        return self.tp / (self.tp + self.fn) if self.tp + self.fn else 0.0
+
+    @property
+    def f1(self) -> float:
+        p, r = self.precision, self.recall
+        return 2 * p * r / (p + r) if p + r else 0.0
+
+    def to_dict(self) -> Dict[str, float]:
+        return {
+            "p": self.precision,
+            "r": self.recall,
+            "f": self.f1,
+            "tp": self.tp,
+            "fp": self.fp,
+            "fn": self.fn,
+        }
+
+
+class NELEvaluator:
+    """
+    Evaluates a spaCy NER/NEL pipeline against gold WebAnno annotations.
+
+    Gold sentences are streamed in and their texts are fed to ``nlp.pipe`` in
+    batches, optionally across several processes. Scores are updated one
+    sentence at a time, so memory does not grow with the size of the test set.
+
+    NER is scored on exact (start, end, label) character spans. NEL is scored
+    on exact (start, end, QID) spans, counting only linked mentions on both
+    sides. Both are reported per label and micro-averaged.
+
+    Attributes:
+        nlp: The spaCy pipeline under evaluation.
+        batch_size (int): Number of texts per ``nlp.pipe`` batch.
+        n_process (int): Number of processes used by ``nlp.pipe``.
+    """
+
+    def __init__(self, nlp, batch_size: int = 256, n_process: int = 1):
+        self.nlp = nlp
+        self.batch_size = batch_size
+        self.n_process = n_process
+
+    def evaluate(
+        self,
+        sentences: Iterable[AnnotationSentence],
+        disagreements: Optional[IO[str]] = None,
+    ) -> Dict:
+        """
+        Run the pipeline over gold sentences and score its predictions.
+
+        Args:
+            sentences (Iterable[AnnotationSentence]): Gold sentences with ``entities``.
+            disagreements (Optional[IO[str]]): Stream receiving a TSV row per
+                false positive or false negative.
+
+        Returns:
+            Dict: ``ner`` and ``nel`` scores (``micro`` and ``per_label``) and the sentence count.
+        """
+        ner: DefaultDict[str, PRFCounts] = defaultdict(PRFCounts)
+        nel: DefaultDict[str, PRFCounts] = defaultdict(PRFCounts)
+        if disagreements is not None:
+            disagreements.write(DISAGREEMENT_HEADER)
+
+        n_sentences = 0
+        for n_sentences, (doc, sentence) in enumerate(self._pipe(sentences), start=1):
+            gold_ner = {(start, end, label) for start, end, label, _ in sentence.entities}
+            pred_ner = {(ent.start_char, ent.end_char, ent.label_) for ent in doc.ents}
+
+            gold_labels = {(start, end): label for start, end, label, _ in sentence.entities}
+            pred_labels = {(ent.start_char, ent.end_char): ent.label_ for ent in doc.ents}
+            gold_nel = {
+                (start, end, qid) for start, end, _, qid in sentence.entities if qid not in UNLINKED_QIDS
+            }
+            pred_nel = {
+                (ent.start_char, ent.end_char, ent.kb_id_) for ent in doc.ents if ent.kb_id_ not in UNLINKED_QIDS
+            }
+
+            ner_errors = self._update(ner, gold_ner, pred_ner, lambda item: item[2], lambda item: item[2])
+            nel_errors = self._update(
+                nel, gold_nel, pred_nel,
+                lambda item: gold_labels[item[:2]], lambda item: pred_labels[item[:2]],
+            )
+            if disagreements is not None:
+                self._write_disagreements(disagreements, n_sentences, sentence.text, "NER", ner_errors)
+                self._write_disagreements(disagreements, n_sentences, sentence.text, "NEL", nel_errors)
+
+        return {
+            "sentences": n_sentences,
+            "ner": self._report(ner),
+            "nel": self._report(nel),
+        }
+
+    def evaluate_files(
+        self,
+        paths: Iterable[str],
+        parser_cls: Type[BaseWebAnnoTSVParser] = WebAnnoNELParser,
+        disagreements_path: Optional[str] = None,
+    ) -> Dict:
+        """
+        Stream-parse gold WebAnno TSV files and evaluate the pipeline on them.
+
+        Args:
+            paths (Iterable[str]): Paths of the gold TSV files.
+            parser_cls (Type[BaseWebAnnoTSVParser]): Parser used to read each file.
+            disagreements_path (Optional[str]): Where to write the disagreement TSV.
+
+        Returns:
+            Dict: See ``evaluate()``.
+        """
+        sentences = (sentence for path in paths for sentence in parser_cls(path).iter_sentences())
+        if disagreements_path is None:
+            return self.evaluate(sentences)
+        with open(disagreements_path, 'w', encoding='utf-8') as f:
+            return self.evaluate(sentences, disagreements=f)
+
+    def _pipe(self, sentences: Iterable[AnnotationSentence]) -> Iterator[Tuple[Doc, AnnotationSentence]]:
+        pairs = ((sentence.text, sentence) for sentence in sentences)
+        return self.nlp.pipe(pairs, as_tuples=True, batch_size=self.batch_size, n_process=self.n_process)
+
+    @staticmethod
+    def _update(
+        counts: DefaultDict[str, PRFCounts],
+        gold: Set[Item],
+        pred: Set[Item],
+        gold_label,
+        pred_label,
+    ) -> List[Tuple[str, Item, str]]:
+        """Add one sentence's items to the per-label counts and return its (error, item, label) list."""
+        errors = []
+        for item in gold & pred:
+            counts[gold_label(item)].tp += 1
+        for item in pred - gold:
+            label = pred_label(item)
+            counts[label].fp += 1
+            errors.append(("FP", item, label))
+        for item in gold - pred:
+            label = gold_label(item)
+            counts[label].fn += 1
+            errors.append(("FN", item, label))
+        return errors
+
+    @staticmethod
+    def _write_disagreements(
+        f: IO[str],
+        sentence_index: int,
+        text: str,
+        task: str,
+        errors: List[Tuple[str, Item, str]],
+    ) -> None:
+        rows = []
+        for error, (start, end, value), label in sorted(errors, key=lambda e: e[1]):
+            qid = value if task == "NEL" else "_"
+            rows.append(f"{sentence_index}\t{task}\t{error}\t{start}\t{end}\t{label}\t{qid}\t{text[start:end]}\n")
+        f.write("".join(rows))
+
+    @staticmethod
+    def _report(counts: Dict[str, PRFCounts]) -> Dict:
+        micro = PRFCounts(
+            tp=sum(c.tp for c in counts.values()),
+            fp=sum(c.fp for c in counts.values()),
+            fn=sum(c.fn for c in counts.values()),
+        )
+        return {
+            "micro": micro.to_dict(),
+            "per_label": {label: counts[label].to_dict() for label in sorted(counts)},
+        }
@@ -2,6 +2,9 @@ from dataclasses import dataclass, field
 from typing import List, Tuple
 from .annotation_token import AnnotationToken
 
+# Entity link values the parsers produce for mentions without a link
+UNLINKED_QIDS = ("*", "NIL", "")
+
 @dataclass
 class AnnotationSentence:
     """Represents a sentence with its tokens and annotations.
@@ -1,5 +1,5 @@
 from abc import ABC
-from typing import List, Dict, Tuple, Optional
+from typing import List, Dict, Tuple, Optional, Iterator, Iterable, FrozenSet
 from collections import defaultdict
 from typing import DefaultDict
 from ..models.annotation_token import AnnotationToken
@@ -8,36 +8,117 @@ from webanno_spacy_converter.models.sentence_with_mwes import MultiWordExpressio
 
 
 class BaseWebAnnoTSVParser(ABC):
-    def __init__(self, file_path: str):
+    def __init__(self, file_path: str, layers: Optional[Iterable[str]] = None):
+        """
+        Args:
+            file_path (str): Path of the WebAnno TSV file.
+            layers (Optional[Iterable[str]]): Names of the layers to extract, as resolved
+                from the ``#T_SP`` headers (e.g. ``value``, ``identifier``, ``value_4``).
+                All other columns are skipped. All layers are extracted if None.
+        """
         self.file_path = file_path
         self.header_lines: List[str] = []
         self.layer_names: Dict[int, str] = {}
         self.sentences: List[AnnotationSentence] = []
+        self.layers: Optional[FrozenSet[str]] = frozenset(layers) if layers is not None else None
+        # (column index, layer name) pairs to extract, set once the headers are read
+        self._projection: Optional[List[Tuple[int, str]]] = None
+        self._max_split = -1
 
     def load_lines(self) -> List[str]:
         with open(self.file_path, 'r', encoding='utf-8') as f:
             return [line.strip() for line in f if line.strip()]
 
     def parse(self) -> List[AnnotationSentence]:
-        lines = self.load_lines()
-        self._extract_headers(lines)
-        sentence_blocks = self._split_sentences(lines)
-        # No need to pass sentence index, as it is read from each token line
-        self.sentences = [self._parse_sentence_lines(block) for block in sentence_blocks]
+        """
+        Parse the whole TSV file into ``self.sentences``.
+
+        Parsing goes through ``iter_sentences()``; ``load_lines()``,
+        ``_extract_headers()`` and ``_split_sentences()`` are no longer used here
+        and are kept only for compatibility with existing callers and subclasses.
+
+        Returns:
+            List[AnnotationSentence]: All parsed sentences in file order.
+        """
+        self.sentences = list(self.iter_sentences())
         return self.sentences
 
+    def iter_sentences(self) -> Iterator[AnnotationSentence]:
+        """
+        Lazily parse the TSV file, yielding one sentence at a time.
+
+        Only the lines of the current sentence block are kept in memory, so
+        arbitrarily large files can be processed in bounded memory. Header
+        lines are consumed as they are encountered.
+
+        Yields:
+            AnnotationSentence: Parsed sentences in file order.
+
+        Raises:
+            ValueError: If a requested layer is not declared in the headers, as soon
+                as the header block ends (also for files without sentences).
+        """
+        self.layer_names = {}
+        self._projection = None
+        block: List[str] = []
+        with open(self.file_path, 'r', encoding='utf-8') as f:
+            for raw_line in f:
+                line = raw_line.strip()
+                if not line:
+                    continue
+                if line.startswith("#T_SP="):
+                    self._extract_header_line(line)
+                elif line.startswith("#Text="):
+                    if self._projection is None:
+                        # The header block is over
+                        self._resolve_projection()
+                    if block:
+                        yield self._parse_sentence_lines(block)
+                    block = [line]
+                elif not line.startswith("#"):
+                    block.append(line)
+        if self._projection is None:
+            self._resolve_projection()
+        if block:
+            yield self._parse_sentence_lines(block)
+
     def _extract_headers(self, lines: List[str]) -> None:
-        col_index = 0
         for line in lines:
             if line.startswith("#T_SP="):
-                cleaned = line[len("#T_SP="):]
-                parts = cleaned.split('|')
-                for name in parts[1:]:  # skip the type name
-                    name = name.strip()
-                    if name in self.layer_names.values():
-                        name = f"{name}_{col_index}"
-                    self.layer_names[col_index] = name.strip()
-                    col_index += 1
+                self._extract_header_line(line)
+
+    def _extract_header_line(self, line: str) -> None:
+        col_index = len(self.layer_names)
+        cleaned = line[len("#T_SP="):]
+        parts = cleaned.split('|')
+        for name in parts[1:]:  # skip the type name
+            name = name.strip()
+            if name in self.layer_names.values():
+                name = f"{name}_{col_index}"
+            self.layer_names[col_index] = name.strip()
+            col_index += 1
+
+    def _resolve_projection(self) -> None:
+        """
+        Map the requested layers to column positions once the headers are known.
+
+        Raises:
+            ValueError: If a requested layer is not declared in the ``#T_SP`` headers.
+        """
+        if self.layers is None:
+            self._projection = []
+            self._max_split = -1
+            return
+        columns = {name: col for col, name in self.layer_names.items()}
+        missing = sorted(self.layers - columns.keys())
+        if missing:
+            raise ValueError(
+                f"Requested layer(s) {missing} not found in {self.file_path}; "
+                f"available layers: {list(self.layer_names.values())}"
+            )
+        self._projection = sorted((columns[name], name) for name in self.layers)
+        # Columns after the last requested one are left unsplit
+        self._max_split = 3 + self._projection[-1][0] + 1 if self._projection else 3
 
     def _split_sentences(self, lines: List[str]) -> List[List[str]]:
         blocks = []
@@ -54,6 +135,8 @@ class BaseWebAnnoTSVParser(ABC):
         return blocks
 
     def _parse_sentence_lines(self, sentence_lines: List[str]) -> AnnotationSentence:
+        if self._projection is None:
+            self._resolve_projection()
         sentence_text = sentence_lines[0][6:]  # Remove "#Text="
         token_lines = sentence_lines[1:]
         min_start_index = None
@@ -73,7 +156,7 @@ class BaseWebAnnoTSVParser(ABC):
         token_index: int,
         min_start_index: Optional[int],
     ) -> Tuple[AnnotationToken, int]:
-        parts = line.split('\t')
+        parts = line.split('\t', self._max_split)
         if len(parts) < 3:
             raise ValueError(f"Malformed token line: {line}")
         # Extract sentence index from the first column (e.g., '1-1')
@@ -97,11 +180,19 @@ class BaseWebAnnoTSVParser(ABC):
         offset_end = end - min_start_index
 
         layers = {}
-        for i, col in enumerate(parts[3:]):
-            if col != "_":
-                layer_name = self.layer_names.get(i, f"layer{i}")
-                layers[layer_name] = col
-        
+        if self.layers is None:
+            for i, col in enumerate(parts[3:]):
+                if col != "_":
+                    layer_name = self.layer_names.get(i, f"layer{i}")
+                    layers[layer_name] = col
+        else:
+            n_parts = len(parts)
+            for i, layer_name in self._projection:
+                if 3 + i < n_parts:
+                    col = parts[3 + i]
+                    if col != "_":
+                        layers[layer_name] = col
+
         token = AnnotationToken(
             sentence_index=sentence_index,
             token_index=token_index,
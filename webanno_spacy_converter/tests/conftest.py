@@ -0,0 +1,9 @@
+def pytest_configure(config):
+    config.addinivalue_line("markers", "memory: slow tracemalloc memory regression suite")
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    report = getattr(config, "memory_report", None)
+    if report:
+        terminalreporter.write_sep("=", "memory per stage (peak traced, RSS growth)")
+        terminalreporter.write_line(report)
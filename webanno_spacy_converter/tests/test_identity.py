@@ -0,0 +1,93 @@
+import os
+
+import pytest
+import spacy
+from spacy.tokens import DocBin
+
+from ..converters.sharded_conversion import ShardedDocBinConversion
+from ..converters.spacy_to_webanno import DocBinToAnnotationSentencesConverter
+from ..converters.webanno_to_spacy import AnnotationSentencesToDocBinConverterV2
+from ..parsers.tsv_parser_v3 import WebAnnoNELParser
+from ..writers.spacy_doc_writer import SpacyDocNELWriter
+from ..writers.webanno_writer import STATE_SUFFIX, WebAnnoMWEWriter, WebAnnoNELWriter
+
+TEST_DATA = os.path.join(os.path.dirname(__file__), "..", "..", "test_data")
+
+
+def read(path: str) -> str:
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+@pytest.fixture(scope="module")
+def nlp():
+    return spacy.blank("sr")
+
+
+@pytest.fixture(scope="module")
+def docs(nlp):
+    return list(DocBin().from_disk(os.path.join(TEST_DATA, "example.spacy")).get_docs(nlp.vocab))
+
+
+@pytest.fixture(scope="module")
+def single_save(nlp, docs, tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("single") / "full.tsv")
+    WebAnnoNELWriter(DocBinToAnnotationSentencesConverter(nlp).convert_docs(docs)).save(path)
+    return path
+
+
+def test_doc_writer_matches_two_step_export(nlp, docs, single_save, tmp_path):
+    path = str(tmp_path / "fused.tsv")
+    SpacyDocNELWriter(docs).save(path)
+    assert read(path) == read(single_save)
+
+
+def test_doc_writer_matches_two_step_export_of_parsed_tsv(nlp, tmp_path):
+    sentences = WebAnnoNELParser(os.path.join(TEST_DATA, "output.tsv")).parse()
+    docs = list(AnnotationSentencesToDocBinConverterV2(nlp, ner=True, nel=True).iter_docs(sentences))
+    fused, two_step = str(tmp_path / "fused.tsv"), str(tmp_path / "two_step.tsv")
+    SpacyDocNELWriter(docs).save(fused)
+    WebAnnoNELWriter(DocBinToAnnotationSentencesConverter(nlp).convert_docs(docs)).save(two_step)
+    assert read(fused) == read(two_step)
+
+
+@pytest.mark.parametrize("mode", ["file", "sentence"])
+@pytest.mark.parametrize("num_shards", [1, 3])
+def test_merged_shards_match_single_node_conversion(nlp, tmp_path, mode, num_shards):
+    converter = AnnotationSentencesToDocBinConverterV2(nlp, ner=True, nel=True)
+    paths = [os.path.join(TEST_DATA, name) for name in ("output.tsv", "output1.tsv")]
+    sentences = [sentence for path in sorted(paths) for sentence in WebAnnoNELParser(path).iter_sentences()]
+    single = str(tmp_path / "single.spacy")
+    converter.convert(sentences).to_disk(single)
+
+    sharding = ShardedDocBinConversion(converter, num_shards=num_shards, mode=mode)
+    for shard in range(num_shards):
+        sharding.convert_shard(paths, shard, str(tmp_path / "shards"))
+    manifests = [str(tmp_path / "shards" / f"shard-{i:05d}-of-{num_shards:05d}.json") for i in range(num_shards)]
+    merged = str(tmp_path / "merged.spacy")
+    sharding.merge(manifests, merged)
+
+    with open(single, 'rb') as a, open(merged, 'rb') as b:
+        assert a.read() == b.read()
+
+
+@pytest.mark.parametrize("drop_state", [False, True])
+def test_append_in_pieces_matches_single_save(nlp, docs, single_save, tmp_path, drop_state):
+    converter = DocBinToAnnotationSentencesConverter(nlp)
+    path = str(tmp_path / "pieces.tsv")
+    cut = len(docs) // 3
+    for piece in (docs[:cut], docs[cut:2 * cut], docs[2 * cut:]):
+        if drop_state and os.path.exists(path + STATE_SUFFIX):
+            os.remove(path + STATE_SUFFIX)
+        WebAnnoNELWriter(converter.convert_docs(piece)).save(path, append=True)
+    assert read(path) == read(single_save)
+
+
+def test_plain_save_writes_no_state(single_save):
+    assert not os.path.exists(single_save + STATE_SUFFIX)
+
+
+def test_append_rejects_other_layers(nlp, docs, single_save):
+    sentences = DocBinToAnnotationSentencesConverter(nlp).convert_docs(docs[:1])
+    with pytest.raises(ValueError):
+        WebAnnoMWEWriter(sentences).save(single_save, append=True)
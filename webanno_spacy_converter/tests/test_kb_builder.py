@@ -0,0 +1,37 @@
+import os
+
+import spacy
+
+from ..converters.kb_builder import KnowledgeBaseBuilder
+from ..parsers.tsv_parser_v3 import WebAnnoNELParser
+
+TEST_DATA = os.path.join(os.path.dirname(__file__), "..", "..", "test_data")
+PATHS = [os.path.join(TEST_DATA, name) for name in ("output.tsv", "output1.tsv", "example.tsv")]
+
+
+def kb_contents(kb):
+    return {
+        alias: sorted((c.entity_, round(c.prior_prob, 6)) for c in kb.get_alias_candidates(alias))
+        for alias in kb.get_alias_strings()
+    }, sorted(kb.get_entity_strings())
+
+
+def test_spilled_counts_build_the_same_kb(tmp_path):
+    vocab = spacy.blank("sr").vocab
+    in_memory = KnowledgeBaseBuilder(vocab, max_candidates=3)
+    in_memory.add_files(PATHS)
+
+    spilled = KnowledgeBaseBuilder(
+        vocab, max_candidates=3, max_entries_in_memory=3, max_spill_runs=2, tmp_dir=str(tmp_path)
+    )
+    spilled.add_files(PATHS)
+    spill_dir = spilled.counter._spill_dir
+    assert spill_dir is not None and 1 <= len(spilled.counter._runs) <= 2
+
+    expected = kb_contents(in_memory.build())
+    assert expected[1]
+    assert kb_contents(spilled.build()) == expected
+
+    spilled.close()
+    in_memory.close()
+    assert not os.path.exists(spill_dir)
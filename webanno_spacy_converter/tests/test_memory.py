@@ -0,0 +1,217 @@
+import os
+import random
+import resource
+import sys
+import tempfile
+import tracemalloc
+from typing import Callable, Dict, List, Tuple
+
+import pytest
+import spacy
+
+from ..converters.spacy_to_webanno import DocBinToAnnotationSentencesConverter
+from ..converters.webanno_to_spacy import AnnotationSentencesToDocBinConverterV2
+from ..models.annotation_sentence import AnnotationSentence
+from ..models.annotation_token import AnnotationToken
+from ..parsers.tsv_parser_v3 import WebAnnoNELParser
+from ..writers.spacy_doc_writer import SpacyDocNELWriter
+from ..writers.webanno_writer import WebAnnoNELWriter
+
+# The whole module is slow (~30 s); deselect it with ``pytest -m "not memory"``
+pytestmark = pytest.mark.memory
+
+# Number of generated sentences per corpus; stages are measured on each size
+MEMORY_CORPUS_SIZES = (250, 1000, 4000)
+
+# Maximum peak traced allocation per stage, in bytes per token. Streaming stages
+# (iter_sentences, nel_writer, doc_writer) hold a bounded amount of data and their
+# per-token cost shrinks as the corpus grows.
+MEMORY_BUDGETS = {
+    "iter_sentences": 64,
+    "parse": 600,
+    "nel_writer": 64,
+    "to_docbin": 400,
+    "from_docbin": 800,
+    "doc_writer": 64,
+}
+
+# Maximum ratio of bytes per token between the largest and the smallest corpus
+MEMORY_MAX_GROWTH = 1.5
+
+# Stages that must hold a bounded amount of data whatever the corpus size, and the
+# maximum ratio of their peak bytes between the largest and the smallest corpus.
+# A B/token budget alone would not notice such a stage becoming linear.
+STREAMING_STAGES = ("iter_sentences", "nel_writer", "doc_writer")
+STREAMING_MAX_PEAK_GROWTH = 1.2
+
+# Write buffer of SpacyDocNELWriter in the suite; the default 1 MiB buffer would
+# dominate the doc_writer peak and hide what the stage itself holds
+DOC_WRITER_BUFFER_SIZE = 4096
+
+WORDS = ["grad", "je", "u", "zemlja", "veliki", "reka", "sever", "i", "od", "ima", "most", "ulica"]
+ENTITIES = [(["Beograd"], "LOC", "Q3711"), (["Novi", "Sad"], "LOC", "Q55630"), (["Nikola", "Tesla"], "PER", "Q9036")]
+
+
+def generate_sentences(n_sentences: int, seed: int = 0) -> List[AnnotationSentence]:
+    """Generate NEL-annotated sentences of 8 to 20 tokens with one to two entities each."""
+    rng = random.Random(seed)
+    sentences = []
+    for sentence_index in range(1, n_sentences + 1):
+        words: List[Tuple[str, str, str]] = []
+        group = 0
+        for _ in range(rng.randint(1, 2)):
+            words.extend((w, "_", "_") for w in rng.choices(WORDS, k=rng.randint(3, 8)))
+            entity_words, label, qid = rng.choice(ENTITIES)
+            if len(entity_words) > 1:
+                group += 1
+                words.extend((w, f"{label}[{group}]", f"{qid}[{group}]") for w in entity_words)
+            else:
+                words.append((entity_words[0], label, qid))
+        words.append((".", "_", "_"))
+
+        tokens = []
+        start = 0
+        for token_index, (word, value, identifier) in enumerate(words, start=1):
+            layers = {} if value == "_" else {"value": value, "identifier": identifier}
+            tokens.append(AnnotationToken(sentence_index, token_index, word, start, start + len(word), layers))
+            start += len(word) + 1
+        sentences.append(AnnotationSentence(text=" ".join(w for w, _, _ in words), tokens=tokens))
+    return sentences
+
+
+def current_rss() -> int:
+    """Return the resident set size of this process in bytes."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        # Peak rather than current RSS, but still monotonic in what we allocate
+        scale = 1 if sys.platform == "darwin" else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+def measure(fn: Callable[[], object]) -> Tuple[object, int, int]:
+    """
+    Run ``fn`` and return its result, peak traced allocation and RSS growth in bytes.
+    """
+    rss_before = current_rss()
+    tracemalloc.start()
+    try:
+        result = fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, peak, current_rss() - rss_before
+
+
+def run_stages(n_sentences: int, workdir: str, nlp) -> Dict[str, Dict[str, float]]:
+    """Run every stage on a generated corpus and record memory per stage."""
+    sentences = generate_sentences(n_sentences)
+    n_tokens = sum(len(s.tokens) for s in sentences)
+    tsv_path = os.path.join(workdir, f"corpus-{n_sentences}.tsv")
+    WebAnnoNELWriter(sentences).save(tsv_path)
+    del sentences
+
+    results: Dict[str, Dict[str, float]] = {}
+
+    def record(stage: str, fn: Callable[[], object]) -> object:
+        result, peak, rss = measure(fn)
+        results[stage] = {
+            "tokens": n_tokens,
+            "peak_bytes": peak,
+            "rss_bytes": rss,
+            "bytes_per_token": peak / n_tokens,
+        }
+        return result
+
+    record("iter_sentences", lambda: sum(1 for _ in WebAnnoNELParser(tsv_path).iter_sentences()))
+    sentences = record("parse", lambda: WebAnnoNELParser(tsv_path).parse())
+    record("nel_writer", lambda: WebAnnoNELWriter(sentences).save(os.path.join(workdir, "nel.tsv")))
+
+    converter = AnnotationSentencesToDocBinConverterV2(nlp, ner=True, nel=True)
+    doc_bin = record("to_docbin", lambda: converter.convert(sentences))
+    del sentences
+
+    record("from_docbin", lambda: DocBinToAnnotationSentencesConverter(nlp).convert_docbin(doc_bin))
+    record(
+        "doc_writer",
+        lambda: SpacyDocNELWriter(doc_bin.get_docs(nlp.vocab)).save(
+            os.path.join(workdir, "docs.tsv"), buffer_size=DOC_WRITER_BUFFER_SIZE
+        ),
+    )
+    return results
+
+
+def run_suite() -> Dict[int, Dict[str, Dict[str, float]]]:
+    """Run all stages for every configured corpus size."""
+    nlp = spacy.blank("sr")
+    with tempfile.TemporaryDirectory() as workdir:
+        # Warm up caches (vocab strings, lazy imports) so they are not billed to the first size
+        run_stages(min(MEMORY_CORPUS_SIZES), workdir, nlp)
+        return {size: run_stages(size, workdir, nlp) for size in MEMORY_CORPUS_SIZES}
+
+
+def check(results: Dict[int, Dict[str, Dict[str, float]]], stage: str) -> List[str]:
+    """Return the budget and growth violations of one stage."""
+    errors = []
+    budget = MEMORY_BUDGETS[stage]
+    for size, stages in results.items():
+        per_token = stages[stage]["bytes_per_token"]
+        if per_token > budget:
+            errors.append(f"{stage}: {per_token:.0f} B/token at {size} sentences exceeds budget of {budget} B/token")
+
+    smallest, largest = min(results), max(results)
+    growth = results[largest][stage]["bytes_per_token"] / results[smallest][stage]["bytes_per_token"]
+    if growth > MEMORY_MAX_GROWTH:
+        errors.append(
+            f"{stage}: B/token grows {growth:.2f}x from {smallest} to {largest} sentences "
+            f"(limit {MEMORY_MAX_GROWTH}x), memory is superlinear"
+        )
+
+    if stage in STREAMING_STAGES:
+        peak_growth = results[largest][stage]["peak_bytes"] / results[smallest][stage]["peak_bytes"]
+        if peak_growth > STREAMING_MAX_PEAK_GROWTH:
+            errors.append(
+                f"{stage}: peak grows {peak_growth:.2f}x from {smallest} to {largest} sentences "
+                f"(limit {STREAMING_MAX_PEAK_GROWTH}x), the stage no longer streams"
+            )
+    return errors
+
+
+def format_report(results: Dict[int, Dict[str, Dict[str, float]]]) -> str:
+    """Format the peak traced allocation and RSS growth of every stage as a table."""
+    lines = [f"{'stage':<16}{'sentences':>10}{'tokens':>10}{'peak KiB':>12}{'RSS KiB':>12}{'B/token':>10}"]
+    for size, stages in results.items():
+        for stage, row in stages.items():
+            lines.append(
+                f"{stage:<16}{size:>10}{row['tokens']:>10}{row['peak_bytes'] / 1024:>12.0f}"
+                f"{row['rss_bytes'] / 1024:>12.0f}{row['bytes_per_token']:>10.0f}"
+            )
+    return "\n".join(lines)
+
+
+@pytest.fixture(scope="module")
+def memory_results(request):
+    results = run_suite()
+    # Printed in the terminal summary by conftest.py
+    request.config.memory_report = format_report(results)
+    return results
+
+
+@pytest.mark.parametrize("stage", sorted(MEMORY_BUDGETS))
+def test_memory_budget(memory_results, stage):
+    errors = check(memory_results, stage)
+    assert not errors, "\n".join(errors) + "\n" + format_report(memory_results)
+
+
+def main():
+    results = run_suite()
+    print(format_report(results))
+    errors = [error for stage in sorted(MEMORY_BUDGETS) for error in check(results, stage)]
+    for error in errors:
+        print(f"FAIL {error}")
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import os
+
+import pytest
+
+from ..converters.mwe_preannotator import MWELexicon, MWEPreAnnotator
+from ..models.annotation_sentence import AnnotationSentence
+from ..models.annotation_token import AnnotationToken
+from ..parsers.tsv_parser_v3 import WebAnnoLEXISParser
+from ..writers.webanno_writer import WebAnnoMWEWriter
+
+TEST_DATA = os.path.join(os.path.dirname(__file__), "..", "..", "test_data")
+LEXIS = os.path.join(TEST_DATA, "test_sr_lexix.tsv")
+MWE_LAYERS = ("MWEid", "MWElemma", "MWEtype")
+
+
+def matches(annotator, text):
+    return [(mwe.token_indices, mwe.lemma) for mwe in annotator.find(text.split())]
+
+
+@pytest.fixture
+def lexicon():
+    lexicon = MWELexicon()
+    lexicon.add(["imati", "pristup"], "imati pristup", "LVC.full", gapped=True)
+    lexicon.add(["u", "skladu", "sa"], "u skladu sa", "AdpID")
+    lexicon.add(["u", "skladu"], "u skladu", "AdpID")
+    lexicon.add(["razmena", "informacija"], "razmena informacija", "NID")
+    lexicon.add(["informacija", "o", "radu"], "informacija o radu", "NID")
+    return lexicon
+
+
+def test_gapped_match(lexicon):
+    assert matches(MWEPreAnnotator(lexicon), "oni imati brz pristup") == [([1, 3], "imati pristup")]
+
+
+def test_max_gap_limits_skipped_tokens(lexicon):
+    text = "imati vrlo brz pristup"
+    assert matches(MWEPreAnnotator(lexicon, max_gap=1), text) == []
+    assert matches(MWEPreAnnotator(lexicon, max_gap=2), text) == [([0, 3], "imati pristup")]
+
+
+def test_gaps_only_for_expressions_seen_gapped(lexicon):
+    text = "razmena svih informacija"
+    assert matches(MWEPreAnnotator(lexicon), text) == []
+    assert matches(MWEPreAnnotator(lexicon, allow_unseen_gaps=True), text) == [([0, 2], "razmena informacija")]
+
+
+def test_overlaps_resolved_longest_then_leftmost(lexicon):
+    annotator = MWEPreAnnotator(lexicon)
+    assert matches(annotator, "u skladu sa planom") == [([0, 1, 2], "u skladu sa")]
+    assert matches(annotator, "razmena informacija o radu") == [([1, 2, 3], "informacija o radu")]
+
+    tied = MWELexicon()
+    tied.add(["dati", "ocenu"], "dati ocenu", "LVC.full")
+    tied.add(["ocenu", "rada"], "ocena rada", "NID")
+    assert matches(MWEPreAnnotator(tied), "dati ocenu rada") == [([0, 1], "dati ocenu")]
+
+
+def test_missing_key_layer_raises():
+    lexicon = MWELexicon(key_layer="value_4")
+    lexicon.add(["imati", "pristup"], "imati pristup")
+    token = AnnotationToken(1, 1, "Imaju", 0, 5, {})
+    with pytest.raises(ValueError):
+        MWEPreAnnotator(lexicon).annotate(AnnotationSentence(text="Imaju", tokens=[token]))
+
+
+def test_lexis_round_trip_through_mwe_writer(tmp_path):
+    gold = WebAnnoLEXISParser(LEXIS).parse()
+    lexicon = MWELexicon.from_files([LEXIS], key_layer="value_4")
+
+    raw = WebAnnoLEXISParser(LEXIS).parse()
+    for sentence in raw:
+        for token in sentence.tokens:
+            for name in MWE_LAYERS:
+                token.layers.pop(name, None)
+    annotated = list(MWEPreAnnotator(lexicon).annotate_all(raw))
+
+    path = str(tmp_path / "mwe.tsv")
+    WebAnnoMWEWriter(annotated).save(path)
+    reparsed = WebAnnoLEXISParser(path).parse()
+
+    def expressions(sentences):
+        return [
+            sorted((tuple(sorted(mwe.token_indices)), mwe.lemma, mwe.type) for mwe in sentence.mwes)
+            for sentence in sentences
+        ]
+
+    assert any(expressions(gold))
+    assert expressions(reparsed) == expressions(gold)
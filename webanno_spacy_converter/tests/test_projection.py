@@ -0,0 +1,50 @@
+import os
+
+import pytest
+
+from ..parsers.tsv_parser_v3 import WebAnnoLEXISParser, WebAnnoNELParser
+
+TEST_DATA = os.path.join(os.path.dirname(__file__), "..", "..", "test_data")
+LEXIS = os.path.join(TEST_DATA, "test_sr_lexix.tsv")
+
+
+@pytest.fixture(scope="module")
+def full_parse():
+    return WebAnnoLEXISParser(LEXIS).parse()
+
+
+@pytest.mark.parametrize("layers", [
+    {"value_4"},
+    {"identifier", "value"},
+    {"PosValue", "MWEid", "MWElemma", "MWEtype"},
+    {"coarseValue", "value_4", "MWEtype"},
+    set(),
+])
+def test_projection_matches_full_parse(full_parse, layers):
+    projected = WebAnnoLEXISParser(LEXIS, layers=layers).parse()
+    assert [s.text for s in projected] == [s.text for s in full_parse]
+    for full, sentence in zip(full_parse, projected):
+        for full_token, token in zip(full.tokens, sentence.tokens):
+            assert (token.text, token.start, token.end) == (full_token.text, full_token.start, full_token.end)
+            assert token.layers == {k: v for k, v in full_token.layers.items() if k in layers}
+
+
+def test_projection_keeps_entities_and_mwes(full_parse):
+    projected = WebAnnoLEXISParser(LEXIS, layers={"identifier", "value", "MWEid", "MWElemma", "MWEtype"}).parse()
+    assert [s.entities for s in projected] == [s.entities for s in full_parse]
+    assert [s.mwes for s in projected] == [s.mwes for s in full_parse]
+
+
+def test_unknown_layer_raises():
+    with pytest.raises(ValueError, match="Lemma"):
+        WebAnnoNELParser(LEXIS, layers={"Lemma"}).parse()
+
+
+def test_unknown_layer_raises_without_sentences(tmp_path):
+    path = tmp_path / "empty.tsv"
+    with open(LEXIS, 'r', encoding='utf-8') as f:
+        header = f.read().split("#Text=")[0]
+    path.write_text(header, encoding='utf-8')
+    assert WebAnnoNELParser(str(path), layers={"value"}).parse() == []
+    with pytest.raises(ValueError):
+        WebAnnoNELParser(str(path), layers={"Lemma"}).parse()
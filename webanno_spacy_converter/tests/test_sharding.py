@@ -0,0 +1,65 @@
+import json
+import os
+import shutil
+
+import pytest
+import spacy
+
+from ..converters.sharded_conversion import ShardedDocBinConversion
+from ..converters.webanno_to_spacy import AnnotationSentencesToDocBinConverterV2
+
+TEST_DATA = os.path.join(os.path.dirname(__file__), "..", "..", "test_data")
+
+
+@pytest.fixture(scope="module")
+def nlp():
+    return spacy.blank("sr")
+
+
+def sharding(nlp, sentences_per_doc=10, num_shards=2):
+    converter = AnnotationSentencesToDocBinConverterV2(nlp, sentences_per_doc=sentences_per_doc, ner=True, nel=True)
+    return ShardedDocBinConversion(converter, num_shards=num_shards, mode="sentence")
+
+
+def convert_all(conversion, paths, output_dir):
+    """Convert every shard and return the manifest paths."""
+    manifests = []
+    for i in range(conversion.num_shards):
+        conversion.convert_shard(paths, i, output_dir)
+        manifests.append(os.path.join(output_dir, f"shard-{i:05d}-of-{conversion.num_shards:05d}.json"))
+    return manifests
+
+
+def test_merge_rejects_other_settings(nlp, tmp_path):
+    manifests = convert_all(sharding(nlp), [os.path.join(TEST_DATA, "output.tsv")], str(tmp_path))
+    with pytest.raises(ValueError, match="settings"):
+        sharding(nlp, sentences_per_doc=5).merge(manifests, str(tmp_path / "merged.spacy"))
+
+
+def test_merge_rejects_different_file_contents(nlp, tmp_path):
+    path = str(tmp_path / "corpus.tsv")
+    shutil.copy(os.path.join(TEST_DATA, "output.tsv"), path)
+    conversion = sharding(nlp)
+    conversion.convert_shard([path], 0, str(tmp_path))
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write("\n")
+    conversion.convert_shard([path], 1, str(tmp_path))
+    manifests = [str(tmp_path / f"shard-{i:05d}-of-00002.json") for i in range(2)]
+    with pytest.raises(ValueError, match="different contents"):
+        conversion.merge(manifests, str(tmp_path / "merged.spacy"))
+
+
+@pytest.mark.parametrize("field", ["tokens", "sources"])
+def test_merge_checks_recorded_counts(nlp, tmp_path, field):
+    conversion = sharding(nlp)
+    manifests = convert_all(conversion, [os.path.join(TEST_DATA, "output.tsv")], str(tmp_path))
+    with open(manifests[0], 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    if field == "tokens":
+        manifest["tokens"] += 1
+    else:
+        next(iter(manifest["sources"].values()))["sentences"] += 1
+    with open(manifests[0], 'w', encoding='utf-8') as f:
+        json.dump(manifest, f)
+    with pytest.raises(ValueError, match="manifests say"):
+        conversion.merge(manifests, str(tmp_path / "merged.spacy"))
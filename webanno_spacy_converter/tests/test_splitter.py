@@ -0,0 +1,86 @@
+import os
+from collections import Counter, defaultdict
+
+import pytest
+import spacy
+
+from ..converters.docbin_splitter import StreamingDocBinSplitter
+from ..converters.webanno_to_spacy import AnnotationSentencesToDocBinConverterV2
+from ..parsers.tsv_parser_v3 import WebAnnoNELParser
+from ..utils.hashing import stable_hash
+
+TEST_DATA = os.path.join(os.path.dirname(__file__), "..", "..", "test_data")
+
+
+@pytest.fixture(scope="module")
+def splitter(tmp_path_factory):
+    converter = AnnotationSentencesToDocBinConverterV2(spacy.blank("sr"), ner=True, nel=True)
+    return StreamingDocBinSplitter(converter, str(tmp_path_factory.mktemp("splits")))
+
+
+def test_long_seeds_are_not_truncated():
+    assert stable_hash("abc", "experiment-seed-1") != stable_hash("abc", "experiment-seed-2")
+
+
+@pytest.mark.parametrize("seed", [str(i) for i in range(10)])
+def test_documents_are_keyed_on_content_not_path(splitter, seed):
+    keep = StreamingDocBinSplitter(splitter.converter, splitter.output_dir, seed=seed, keep_documents_together=True)
+    path = os.path.join(TEST_DATA, "output.tsv")
+    spelled = os.path.join(TEST_DATA, ".", "output.tsv")
+    assert [name for name, _ in keep.assign_files([path])] == [name for name, _ in keep.assign_files([spelled])]
+
+
+def stratum_counts(splitter, sentences, stratify):
+    """Count the units of every stratum per split."""
+    strata = StreamingDocBinSplitter(splitter.converter, splitter.output_dir, stratify=stratify)
+    counts = defaultdict(Counter)
+    for name, unit in splitter.assign(sentences):
+        counts[strata._stratum(unit)][name] += 1
+    return counts
+
+
+def mean_deviation(counts, ratios, min_units=20):
+    """
+    Mean over strata of the summed absolute deviation of split fractions from the ratios.
+
+    Strata with fewer than ``min_units`` units cannot be split close to the ratios at all and are left out.
+    """
+    deviations = [
+        sum(abs(c[name] / sum(c.values()) - ratio) for name, ratio in ratios.items())
+        for c in counts.values()
+        if sum(c.values()) >= min_units
+    ]
+    return sum(deviations) / len(deviations)
+
+
+@pytest.fixture(scope="module")
+def corpus():
+    paths = [os.path.join(TEST_DATA, name) for name in ("output.tsv", "output1.tsv", "example.tsv")]
+    return [sentence for path in paths for sentence in WebAnnoNELParser(path).iter_sentences()]
+
+
+@pytest.mark.parametrize("stratify", ["label", "qid"])
+def test_stratify_balances_every_stratum(splitter, corpus, stratify):
+    plain_deviation = stratified_deviation = 0.0
+    for seed in map(str, range(10)):
+        plain = StreamingDocBinSplitter(splitter.converter, splitter.output_dir, seed=seed)
+        stratified = StreamingDocBinSplitter(splitter.converter, splitter.output_dir, seed=seed, stratify=stratify)
+        plain_deviation += mean_deviation(stratum_counts(plain, corpus, stratify), plain.ratios)
+
+        counts = stratum_counts(stratified, corpus, stratify)
+        stratified_deviation += mean_deviation(counts, stratified.ratios)
+        for c in counts.values():
+            n = sum(c.values())
+            assert all(c[name] <= ratio * n + stratified.tolerance + 1 for name, ratio in stratified.ratios.items())
+    assert stratified_deviation < plain_deviation / 2
+
+
+def test_stratified_assignment_is_reproducible_and_never_leaks(splitter, corpus):
+    stratified = StreamingDocBinSplitter(splitter.converter, splitter.output_dir, stratify="label")
+    repeated = corpus + corpus[:300]
+    first = [(name, unit[0].text) for name, unit in stratified.assign(repeated)]
+    assert first == [(name, unit[0].text) for name, unit in stratified.assign(repeated)]
+    splits = defaultdict(set)
+    for name, text in first:
+        splits[text].add(name)
+    assert all(len(names) == 1 for names in splits.values())
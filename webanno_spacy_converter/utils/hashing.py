@@ -0,0 +1,48 @@
+import hashlib
+
+# 64-bit digests give 2**64 buckets, more than enough for any split or shard ratio
+_DIGEST_SIZE = 8
+_MAX_HASH = 2 ** (_DIGEST_SIZE * 8)
+# blake2b accepts at most 16 bytes of personalization
+_SALT_SIZE = 16
+
+
+def _salt(seed: str) -> bytes:
+    """Condense a seed of any length into blake2b's 16-byte personalization."""
+    return hashlib.blake2b(seed.encode("utf-8"), digest_size=_SALT_SIZE).digest()
+
+
+def stable_hash(key: str, seed: str = "") -> int:
+    """
+    Compute a hash of ``key`` that is stable across processes and machines.
+
+    Python's built-in ``hash()`` is salted per process, so it cannot be used
+    for assignments that must be reproducible between runs.
+
+    Args:
+        key (str): The value to hash (e.g. sentence text or file path).
+        seed (str): Optional salt of any length; changing it yields an independent assignment.
+
+    Returns:
+        int: An unsigned 64-bit integer.
+    """
+    digest = hashlib.blake2b(
+        key.encode("utf-8"),
+        digest_size=_DIGEST_SIZE,
+        person=_salt(seed),
+    ).digest()
+    return int.from_bytes(digest, "big")
+
+
+def hash_fraction(key: str, seed: str = "") -> float:
+    """
+    Map ``key`` deterministically onto the interval [0, 1).
+
+    Args:
+        key (str): The value to hash.
+        seed (str): Optional salt.
+
+    Returns:
+        float: A pseudo-uniform value in [0, 1).
+    """
+    return stable_hash(key, seed) / _MAX_HASH
@@ -0,0 +1,131 @@
+import heapq
+import json
+import os
+import shutil
+import tempfile
+from collections import defaultdict
+from typing import DefaultDict, Iterable, Iterator, List, Optional, Tuple
+
+Key = Tuple[str, ...]
+
+
+class SpillToDiskCounter:
+    """
+    Exact counter for string-tuple keys with a bounded in-memory footprint.
+
+    Counts are accumulated in a dict until it holds ``max_entries`` keys; the
+    dict is then written to disk as a sorted run and cleared. ``items()``
+    merges all runs with the in-memory remainder, yielding every key once,
+    in sorted order, with its total count. Memory use is bounded by
+    ``max_entries`` regardless of how many distinct keys are counted.
+
+    Merging keeps one file open per run, so once there are more than
+    ``max_runs`` runs they are compacted into a single run. The number of
+    files open at once therefore never exceeds ``max_runs + 1``.
+
+    Use as a context manager (or call ``close()``) to remove the spill files.
+
+    Attributes:
+        max_entries (int): Maximum number of distinct keys kept in memory.
+        tmp_dir (Optional[str]): Parent directory for spill files; system default if None.
+        max_runs (int): Maximum number of spill runs before they are compacted.
+    """
+
+    def __init__(self, max_entries: int = 1_000_000, tmp_dir: Optional[str] = None, max_runs: int = 64):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        if max_runs < 2:
+            raise ValueError("max_runs must be at least 2")
+        self.max_entries = max_entries
+        self.tmp_dir = tmp_dir
+        self.max_runs = max_runs
+        self._counts: DefaultDict[Key, int] = defaultdict(int)
+        self._runs: List[str] = []
+        self._next_run = 0
+        self._spill_dir: Optional[str] = None
+
+    def add(self, key: Key, count: int = 1) -> None:
+        """
+        Increment the count of ``key``.
+
+        Args:
+            key (Tuple[str, ...]): The key to count.
+            count (int): Amount to add.
+        """
+        self._counts[key] += count
+        if len(self._counts) >= self.max_entries:
+            self._spill()
+
+    def items(self) -> Iterator[Tuple[Key, int]]:
+        """
+        Yield every key with its total count, sorted by key.
+
+        Can be called repeatedly; each call re-reads the spill files.
+
+        Yields:
+            Tuple[Tuple[str, ...], int]: Key and aggregated count.
+        """
+        streams = [self._read_run(path) for path in self._runs]
+        streams.append(iter(sorted(self._counts.items())))
+        return self._aggregate(streams)
+
+    @staticmethod
+    def _aggregate(streams: List[Iterator[Tuple[Key, int]]]) -> Iterator[Tuple[Key, int]]:
+        """Merge sorted (key, count) streams, summing the counts of equal keys."""
+        current_key: Optional[Key] = None
+        current_count = 0
+        for key, count in heapq.merge(*streams):
+            if key == current_key:
+                current_count += count
+                continue
+            if current_key is not None:
+                yield current_key, current_count
+            current_key, current_count = key, count
+        if current_key is not None:
+            yield current_key, current_count
+
+    def close(self) -> None:
+        """Delete all spill files and reset the counter."""
+        if self._spill_dir is not None:
+            shutil.rmtree(self._spill_dir, ignore_errors=True)
+        self._spill_dir = None
+        self._runs = []
+        self._next_run = 0
+        self._counts.clear()
+
+    def __enter__(self) -> "SpillToDiskCounter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _spill(self) -> None:
+        if self._spill_dir is None:
+            self._spill_dir = tempfile.mkdtemp(prefix="spill-counter-", dir=self.tmp_dir)
+        self._runs.append(self._write_run(sorted(self._counts.items())))
+        self._counts.clear()
+        if len(self._runs) > self.max_runs:
+            self._compact()
+
+    def _compact(self) -> None:
+        """Merge all spill runs into a single run."""
+        runs = self._runs
+        merged = self._write_run(self._aggregate([self._read_run(path) for path in runs]))
+        for path in runs:
+            os.remove(path)
+        self._runs = [merged]
+
+    def _write_run(self, items: Iterable[Tuple[Key, int]]) -> str:
+        path = os.path.join(self._spill_dir, f"run-{self._next_run:05d}.jsonl")
+        self._next_run += 1
+        with open(path, 'w', encoding='utf-8') as f:
+            for key, count in items:
+                f.write(json.dumps([list(key), count], ensure_ascii=False) + "\n")
+        return path
+
+    @staticmethod
+    def _read_run(path: str) -> Iterator[Tuple[Key, int]]:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                key, count = json.loads(line)
+                yield tuple(key), count
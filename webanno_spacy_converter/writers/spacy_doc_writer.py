@@ -0,0 +1,177 @@
+from typing import IO, Iterable, List, Tuple
+from spacy.attrs import ENT_IOB, ENT_KB_ID, ENT_TYPE, IDX, LENGTH, SENT_START
+from spacy.errors import Errors
+from spacy.tokens import Doc
+from webanno_spacy_converter.writers.webanno_writer import (
+    NEL_LAYER_HEADER,
+    WEBANNO_FORMAT_HEADER,
+    format_nel_identifier,
+)
+
+# Values of the ENT_IOB attribute, see spacy.tokens.Token.ent_iob
+_IOB_INSIDE = 1
+_IOB_BEGIN = 3
+
+_NO_ENTITY = ("_", "_")
+
+
+class SpacyDocNELWriter:
+    """
+    Writes spaCy Docs straight to the WebAnno TSV 3.3 NEL format.
+
+    Produces the same bytes as running ``DocBinToAnnotationSentencesConverter.convert_docs()``
+    followed by ``WebAnnoNELWriter.save()``, but reads token and entity data from
+    ``Doc.to_array()`` and formats each entity once, without building an
+    AnnotationToken or layers dict per token. Docs are consumed lazily, so a
+    ``DocBin.get_docs()`` generator can be exported without loading it fully.
+
+    Attributes:
+        docs (Iterable[Doc]): The Docs to export; each must have sentence boundaries.
+    """
+
+    def __init__(self, docs: Iterable[Doc]):
+        self.docs = docs
+
+    def save(self, output_path: str, buffer_size: int = 1 << 20) -> None:
+        """
+        Save the Docs to a TSV file at the specified path.
+
+        Args:
+            output_path (str): Path to the file where output should be written.
+            buffer_size (int): Size in bytes of the write buffer.
+        """
+        with open(output_path, 'w', encoding='utf-8', buffering=buffer_size) as f:
+            self.write(f)
+
+    def write(self, f: IO[str]) -> None:
+        """
+        Write the headers and one block per sentence to an open text stream.
+
+        Args:
+            f (IO[str]): Writable text stream.
+        """
+        f.write(WEBANNO_FORMAT_HEADER + "\n")
+        f.write(NEL_LAYER_HEADER + "\n\n")
+
+        sentence_index = 1
+        group_counter = 1
+        offset = 0
+        for doc in self.docs:
+            sentence_index, group_counter, offset = self._write_doc(
+                f, doc, sentence_index, group_counter, offset
+            )
+
+    def _write_doc(
+        self,
+        f: IO[str],
+        doc: Doc,
+        sentence_index: int,
+        group_counter: int,
+        offset: int,
+    ) -> Tuple[int, int, int]:
+        """
+        Write all sentences of a single Doc.
+
+        Args:
+            f (IO[str]): Writable text stream.
+            doc (Doc): The Doc to export.
+            sentence_index (int): 1-based index of the first sentence of this Doc.
+            group_counter (int): Next free group id for multi-token entities.
+            offset (int): Cumulative character offset of all previous sentences.
+
+        Returns:
+            Tuple[int, int, int]: Updated sentence index, group counter and offset.
+        """
+        if not doc.has_annotation("SENT_START"):
+            raise ValueError(Errors.E030)
+
+        rows = doc.to_array([IDX, LENGTH, ENT_IOB, ENT_TYPE, ENT_KB_ID, SENT_START]).tolist()
+        text = doc.text
+        n_tokens = len(rows)
+
+        fields, group_counter = self._entity_fields(doc, rows, group_counter)
+
+        if "sents" in doc.user_hooks:
+            starts = [sent.start for sent in doc.sents]
+        elif n_tokens:
+            starts = [0] + [i for i in range(1, n_tokens) if rows[i][5] == 1]
+        else:
+            starts = []
+        ends = starts[1:] + [n_tokens]
+
+        for sent_start, sent_end in zip(starts, ends):
+            sent_char_start = rows[sent_start][0]
+            last_idx, last_len = rows[sent_end - 1][0], rows[sent_end - 1][1]
+            sent_text = text[sent_char_start:last_idx + last_len]
+            shift = offset - sent_char_start
+
+            lines: List[str] = ["\n#Text=", sent_text, "\n"]
+            prefix = f"{sentence_index}-"
+            for i in range(sent_start, sent_end):
+                idx, length = rows[i][0], rows[i][1]
+                identifier, value = fields[i]
+                lines.append(
+                    f"{prefix}{i - sent_start + 1}\t{idx + shift}-{idx + length + shift}\t"
+                    f"{text[idx:idx + length]}\t{identifier}\t{value}\t\n"
+                )
+            f.write("".join(lines))
+
+            offset += len(sent_text)
+            sentence_index += 1
+
+        return sentence_index, group_counter, offset
+
+    def _entity_fields(
+        self,
+        doc: Doc,
+        rows: List[List[int]],
+        group_counter: int,
+    ) -> Tuple[List[Tuple[str, str]], int]:
+        """
+        Compute the (identifier, value) columns of every token in a Doc.
+
+        All tokens of an entity share one formatted tuple; tokens outside
+        entities share the ``("_", "_")`` tuple.
+
+        Args:
+            doc (Doc): The Doc being exported.
+            rows (List[List[int]]): Output of ``Doc.to_array()`` as nested lists.
+            group_counter (int): Next free group id for multi-token entities.
+
+        Returns:
+            Tuple[List[Tuple[str, str]], int]: Per-token columns and the updated group counter.
+        """
+        strings = doc.vocab.strings
+        n_tokens = len(rows)
+        fields: List[Tuple[str, str]] = [_NO_ENTITY] * n_tokens
+
+        i = 0
+        while i < n_tokens:
+            if rows[i][2] != _IOB_BEGIN:
+                i += 1
+                continue
+            end = i + 1
+            while end < n_tokens and rows[end][2] == _IOB_INSIDE:
+                end += 1
+
+            label = strings[rows[i][3]]
+            kb_hash = rows[i][4]
+            kb_id = strings[kb_hash] if kb_hash else ""
+            if kb_id == "NIL":
+                kb_id = "*"
+
+            if end - i > 1:
+                group = str(group_counter)
+                group_counter += 1
+                value = f"{label}[{group}]"
+                identifier = f"{kb_id}[{group}]" if kb_id != "*" else kb_id
+            else:
+                value = label
+                identifier = kb_id
+
+            entity = (format_nel_identifier(identifier, value), value)
+            for j in range(i, end):
+                fields[j] = entity
+            i = end
+
+        return fields, group_counter
@@ -1,8 +1,19 @@
-from typing import List
+import json
+import os
+import re
+from typing import IO, List, Optional, Tuple
 from abc import ABC, abstractmethod
 from webanno_spacy_converter.models.annotation_sentence import AnnotationSentence
 from webanno_spacy_converter.models.annotation_token import AnnotationToken
 
+WEBANNO_FORMAT_HEADER = "#FORMAT=WebAnno TSV 3.3"
+NEL_LAYER_HEADER = "#T_SP=de.tudarmstadt.ukp.dkpro.core.api.ner.type.NamedEntity|identifier|value"
+MWE_LAYER_HEADER = "#T_SP=webanno.custom.MWE|MWEid|MWElemma|MWEtype"
+STATE_SUFFIX = ".state.json"
+
+# Disambiguation id of a multi-token annotation, e.g. the "[3]" of "LOC[3]" or "LOC[3]|PER[4]"
+_GROUP_ID = re.compile(r"\[(\d+)\](?=\||$)")
+
 class BaseWebAnnoTSVWriter(ABC):
     """
     Abstract base class for writing annotations to the WebAnno TSV 3.x format.
@@ -18,33 +29,145 @@ class BaseWebAnnoTSVWriter(ABC):
     def __init__(self, sentences: List[AnnotationSentence]):
         self.sentences = sentences
 
-    def save(self, output_path: str) -> None:
+    def save(self, output_path: str, append: bool = False, write_state: bool = False) -> None:
         """
         Save the annotations to a TSV file at the specified path.
 
         The format includes the WebAnno format header, the annotation layer specification,
         and one block per sentence with token annotations.
 
+        In append mode the sentences are added to the end of an existing file
+        whose layer header must match this writer's. The last sentence index,
+        character offset and highest ``[N]`` disambiguation id are restored from
+        the ``<output_path>.state.json`` sidecar. If the sidecar is missing or
+        stale, the index and offset are read from the file tail and the id from
+        a full scan of the file. New sentences are numbered on from the last one
+        and the ``[N]`` ids of their tokens are shifted past the existing ones,
+        so they stay unique within the document. Only the new blocks are written.
+
         Args:
             output_path (str): Path to the file where output should be written.
+            append (bool): Append to the file instead of overwriting it. A missing
+                or empty file is written from scratch.
+            write_state (bool): Write the sidecar even when not appending, so a
+                later append does not have to scan the file. Always on in append mode.
+
+        Raises:
+            ValueError: If the existing file declares different annotation layers.
+        """
+        state_path = output_path + STATE_SUFFIX
+        if append and os.path.exists(output_path) and os.path.getsize(output_path) > 0:
+            self._check_layer_header(output_path)
+            last_index, offset, group_id = self._restore_state(output_path)
+            with open(output_path, 'a', encoding='utf-8') as f:
+                last_index, offset, group_id = self._write_sentences(
+                    f, offset, first_index=last_index + 1, group_offset=group_id
+                )
+        else:
+            with open(output_path, 'w', encoding='utf-8') as f:
+                # WebAnno requires this header for file format version
+                f.write(WEBANNO_FORMAT_HEADER + "\n")
+                # Layer header defined by subclass
+                f.write(self._build_layer_header() + "\n\n")
+                last_index, offset, group_id = self._write_sentences(f, 0)
+
+        if append or write_state:
+            state = {
+                "sentence_index": last_index,
+                "offset": offset,
+                "group_id": group_id,
+                "size": os.path.getsize(output_path),
+            }
+            with open(state_path, 'w', encoding='utf-8') as f:
+                json.dump(state, f)
+        elif os.path.exists(state_path):
+            # The file was rewritten, so a sidecar left by an earlier save is stale
+            os.remove(state_path)
+
+    def _write_sentences(
+        self,
+        f: IO[str],
+        offset: int,
+        first_index: Optional[int] = None,
+        group_offset: int = 0,
+    ) -> Tuple[int, int, int]:
+        """
+        Write one block per sentence.
+
+        Args:
+            f (IO[str]): Writable text stream.
+            offset (int): Cumulative character offset of the sentences already in the file.
+            first_index (Optional[int]): Number the sentences from this index; the
+                tokens' own ``sentence_index`` is used if None.
+            group_offset (int): Added to every ``[N]`` disambiguation id of the tokens.
+
+        Returns:
+            Tuple[int, int, int]: Index of the last written sentence, the new offset
+            and the highest ``[N]`` id in the file.
+        """
+        last_index = first_index - 1 if first_index is not None else 0
+        max_group = group_offset
+
+        def shift(match: "re.Match") -> str:
+            nonlocal max_group
+            group = int(match.group(1)) + group_offset
+            max_group = max(max_group, group)
+            return f"[{group}]"
+
+        for i, sentence in enumerate(self.sentences):
+            if first_index is not None:
+                last_index = first_index + i
+            elif sentence.tokens:
+                last_index = sentence.tokens[-1].sentence_index
+            f.write("\n")
+            f.write(f"#Text={sentence.text}\n")
+            for token in sentence.tokens:
+                sentence_index = last_index if first_index is not None else token.sentence_index
+                layers = [_GROUP_ID.sub(shift, field) if "[" in field else field
+                          for field in self._format_token_layers(token)]
+                abs_start = token.start + offset
+                abs_end = token.end + offset
+                line = f"{sentence_index}-{token.token_index}\t{abs_start}-{abs_end}\t{token.text}\t" + "\t".join(layers) + "\t"
+                f.write(line + "\n")
+            offset += len(sentence.text)
+        return last_index, offset, max_group
+
+    @staticmethod
+    def _restore_state(output_path: str) -> Tuple[int, int, int]:
+        """
+        Recover the last sentence index, cumulative offset and highest ``[N]`` id of an existing file.
+
+        Args:
+            output_path (str): Path of the existing TSV file.
+
+        Returns:
+            Tuple[int, int, int]: Last sentence index, character offset and highest disambiguation id.
+        """
+        state_path = output_path + STATE_SUFFIX
+        if os.path.exists(state_path):
+            with open(state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            if state.get("size") == os.path.getsize(output_path) and "group_id" in state:
+                return state["sentence_index"], state["offset"], state["group_id"]
+        return _scan_tail_state(output_path) + (_scan_max_group_id(output_path),)
+
+    def _check_layer_header(self, output_path: str) -> None:
+        """
+        Ensure an existing file declares the same annotation layers as this writer.
+
+        Args:
+            output_path (str): Path of the existing TSV file.
+
+        Raises:
+            ValueError: If the ``#T_SP`` lines of the file differ from ``_build_layer_header()``.
         """
-        with open(output_path, 'w', encoding='utf-8') as f:
-            # WebAnno requires this header for file format version
-            f.write("#FORMAT=WebAnno TSV 3.3\n")
-            # Layer header defined by subclass
-            f.write(self._build_layer_header() + "\n\n")
-
-            offset = 0  # cumulative character offset
-            for i, sentence in enumerate(self.sentences, start=1):
-                f.write("\n")
-                f.write(f"#Text={sentence.text}\n")
-                for token in sentence.tokens:
-                    layers = self._format_token_layers(token)
-                    abs_start = token.start + offset
-                    abs_end = token.end + offset
-                    line = f"{token.sentence_index}-{token.token_index}\t{abs_start}-{abs_end}\t{token.text}\t" + "\t".join(layers) + "\t"
-                    f.write(line + "\n")
-                offset += len(sentence.text)
+        expected = [line for line in self._build_layer_header().split("\n") if line]
+        found = _read_layer_header(output_path)
+        if found != expected:
+            raise ValueError(
+                f"Cannot append to {output_path}: it declares layers {found}, "
+                f"but {type(self).__name__} writes {expected}"
+            )
 
     @abstractmethod
     def _build_layer_header(self) -> str:
@@ -88,7 +211,7 @@ class WebAnnoNELWriter(BaseWebAnnoTSVWriter):
         Returns:
             str: TSV layer definition line.
         """
-        return "#T_SP=de.tudarmstadt.ukp.dkpro.core.api.ner.type.NamedEntity|identifier|value"
+        return NEL_LAYER_HEADER
 
     def _format_token_layers(self, token: AnnotationToken) -> List[str]:
         """
@@ -102,14 +225,151 @@ class WebAnnoNELWriter(BaseWebAnnoTSVWriter):
         """
         identifier = token.layers.get("identifier", "_")
         value = token.layers.get("value", "_")
+        return [format_nel_identifier(identifier, value), value]
+
+
+class WebAnnoMWEWriter(BaseWebAnnoTSVWriter):
+    """
+    WebAnno TSV writer for multi-word expressions.
+
+    Writes the three columns of the custom LEXIS MWE layer per token:
+        - 'MWEid': number linking the tokens of one expression
+        - 'MWElemma': canonical form of the expression
+        - 'MWEtype': expression type (e.g. LVC.full, NID)
+    """
+
+    def _build_layer_header(self) -> str:
+        """
+        Build the layer header for MWE output.
+
+        Returns:
+            str: TSV layer definition line.
+        """
+        return MWE_LAYER_HEADER
+
+    def _format_token_layers(self, token: AnnotationToken) -> List[str]:
+        """
+        Extract MWE annotation data for a token.
+
+        Args:
+            token (AnnotationToken): Token object with layers.
+
+        Returns:
+            List[str]: A list with [MWEid, MWElemma, MWEtype] fields.
+        """
+        return [token.layers.get(name, "_") for name in ("MWEid", "MWElemma", "MWEtype")]
+
+
+def format_nel_identifier(identifier: str, value: str) -> str:
+    """
+    Normalize an entity link for the NEL ``identifier`` column.
+
+    Bare QIDs are expanded to Wikidata entity URLs; an empty identifier
+    becomes ``*`` on annotated tokens and ``_`` otherwise.
+
+    Args:
+        identifier (str): Raw identifier (QID, URL, ``*`` or ``_``).
+        value (str): The NER value of the same token.
+
+    Returns:
+        str: The identifier as written to the TSV file.
+    """
+    if identifier != "*" and identifier != "_" and len(identifier)>0 and not identifier.startswith("http"):
+        identifier = f"http://www.wikidata.org/entity/{identifier}"
+
+    if len(identifier) == 0:
+        if value == "_":
+            identifier = "_"
+        else:
+            identifier = "*"
+
+    return identifier
 
-        if identifier != "*" and identifier != "_" and len(identifier)>0 and not identifier.startswith("http"):
-            identifier = f"http://www.wikidata.org/entity/{identifier}"
-        
-        if len(identifier) == 0:
-            if value == "_":
-                identifier = "_"
+
+def _read_layer_header(output_path: str) -> List[str]:
+    """
+    Read the ``#T_SP`` layer declarations from the head of a TSV file.
+
+    Args:
+        output_path (str): Path of the existing TSV file.
+
+    Returns:
+        List[str]: The ``#T_SP=`` lines, in file order.
+    """
+    header = []
+    with open(output_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.rstrip("\r\n")
+            if line.startswith("#T_SP="):
+                header.append(line)
+            elif line and not line.startswith("#FORMAT="):
+                break
+    return header
+
+
+def _scan_max_group_id(output_path: str) -> int:
+    """
+    Find the highest ``[N]`` disambiguation id in a TSV file.
+
+    Unlike the sentence index and offset, the id cannot be recovered from the
+    file tail, so this reads the whole file. It is only needed when the state
+    sidecar is missing or stale.
+
+    Args:
+        output_path (str): Path of the existing TSV file.
+
+    Returns:
+        int: The highest id, or 0 if the file has none.
+    """
+    max_group = 0
+    with open(output_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if "[" not in line or line.startswith("#"):
+                continue
+            for field in line.rstrip("\r\n").split("\t")[3:]:
+                for group in _GROUP_ID.findall(field):
+                    max_group = max(max_group, int(group))
+    return max_group
+
+
+def _scan_tail_state(output_path: str, chunk_size: int = 1 << 16) -> Tuple[int, int]:
+    """
+    Recover the append state of a TSV file by reading only its last sentence block.
+
+    The offset after the last sentence is the absolute start of its first
+    token plus the length of its text, since sentence-relative token offsets
+    start at 0. Reads backwards in growing chunks until a complete block is found.
+
+    Args:
+        output_path (str): Path of the existing TSV file.
+        chunk_size (int): Initial number of bytes read from the end of the file.
+
+    Returns:
+        Tuple[int, int]: Last sentence index and character offset (0, 0 if the file has no sentences).
+    """
+    size = os.path.getsize(output_path)
+    with open(output_path, 'rb') as f:
+        while True:
+            read = min(size, chunk_size)
+            f.seek(size - read)
+            tail = f.read(read)
+            marker = tail.rfind(b"\n#Text=")
+            if marker != -1:
+                block_start = marker + 1
+            elif read == size and tail.startswith(b"#Text="):
+                block_start = 0
+            elif read == size:
+                return 0, 0
             else:
-                identifier = "*"
+                chunk_size *= 2
+                continue
 
-        return [identifier, value]
+            lines = tail[block_start:].decode('utf-8').split("\n")
+            text = lines[0][len("#Text="):].rstrip("\r")
+            token_lines = [line for line in lines[1:] if line and not line.startswith("#")]
+            if not token_lines:
+                raise ValueError(f"Cannot restore append state: last sentence of {output_path} has no tokens")
+            sent_token, position = token_lines[0].split("\t", 2)[:2]
+            sentence_index = int(sent_token.split("-")[0])
+            abs_start = int(position.split("-")[0])
+            return sentence_index, abs_start + len(text)